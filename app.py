@@ -1,39 +1,223 @@
 from flask import Flask, render_template, request, jsonify
-from datetime import datetime
+from datetime import datetime, date, timedelta
+import atexit
+import csv
+import gzip
+import hashlib
 import json
 import random
 import requests
 import time
 import sqlite3
-from contextlib import closing
+import threading
+import re
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from types import MappingProxyType
+from urllib.parse import quote
+from zoneinfo import ZoneInfo
 import os
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
+from rollover import DayRollover
+from roster_store import RosterStore
+from search_index import PlayerSearchIndex, normalize_search_key, phonetic_keys
+from caching import LRUCache, SingleFlight
+from daily_stats import DailyStats, DayStats
+from guess_log import GuessLog
+from jobs import JobRunner
 
 # Load environment variables
 load_dotenv()
 
 # Configuration
 DATABASE = 'players.db'
+ALIASES_FILE = os.path.join('data', 'aliases.csv')
+
+# Seed roster, one JSON object per line after a version header
+PLAYERS_FILE = os.path.join('data', 'players.jsonl')
+PLAYERS_FILE_VERSION = 1
+
+# Where roster refreshes come from: 'static' (PLAYERS_FILE) or 'football-data'
+# (the squads in config.TEAM_IDS, fetched from football-data.org)
+PLAYER_SOURCE = os.getenv('PLAYER_SOURCE', 'static')
+
+# Daily puzzle schedule: seed for the local RNG, how far ahead to plan,
+# and how many days must pass before a player can be the answer again
+PUZZLE_SEED = 'guess-the-player'
+PUZZLE_SCHEDULE_DAYS = 180
+PUZZLE_NO_REPEAT_DAYS = 365
+
+# The puzzle day changes at PUZZLE_ROLLOVER past midnight in PUZZLE_TIMEZONE;
+# the next day's puzzle is built PUZZLE_PREWARM_SECONDS before that
+PUZZLE_TIMEZONE = ZoneInfo(os.getenv('PUZZLE_TIMEZONE', 'Europe/London'))
+PUZZLE_ROLLOVER = timedelta(0)
+PUZZLE_PREWARM_SECONDS = 300
+
+# For testing, always use this player as the answer when present
+# (set to None to use the puzzle schedule)
+TEST_DAILY_PLAYER = 'Haaland'
+
+# Search response cache limits
+SEARCH_CACHE_SIZE = 4096
+SEARCH_CACHE_TTL = 600
+
+# bm25 weights for the name, team and nationality columns of players_fts
+FTS_COLUMN_WEIGHTS = (10.0, 2.0, 1.0)
+
+# Most guesses a single /api/guess/batch request may evaluate
+MAX_BATCH_GUESSES = 50
+
+# Tuning applied to every SQLite connection (the writer also switches the file to WAL)
+SQLITE_PRAGMAS = (
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -16000',
+    'PRAGMA mmap_size = 268435456',
+    'PRAGMA busy_timeout = 5000',
+)
+SQLITE_STATEMENT_CACHE = 256
+
+# Idle read-only connections kept for reuse
+READ_POOL_SIZE = 16
+
+# Guess events are written in batches of up to this many, at least this often (seconds)
+GUESS_LOG_BATCH = 500
+GUESS_LOG_INTERVAL = 1.0
+
+# How often the running daily stats are saved, and how many wrong guesses they list
+STATS_CHECKPOINT_INTERVAL = 30
+STATS_TOP_WRONG = 5
 
 # Initialize Flask app
 app = Flask(__name__)
 
-def get_db():
-    """Get database connection"""
-    db = sqlite3.connect(DATABASE)
+# In-memory autocomplete index, rebuilt whenever the roster is saved
+search_index = None
+
+# Columnar copy of the players table that the read paths use instead of SQLite
+roster_store = None
+
+# Bumped whenever the players table is rewritten; part of every cache key
+# so results computed against an older roster are never served
+roster_generation = 0
+
+# Serialized search responses keyed by (generation, mode, normalized query)
+search_cache = LRUCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+
+# Today's answer and the serialized feedback for every possible guess
+DailyPuzzle = namedtuple('DailyPuzzle', ['date', 'generation', 'player', 'feedback'])
+daily_puzzle = None
+daily_puzzle_lock = threading.Lock()
+
+# Tomorrow's puzzle, built ahead of the rollover and swapped in when it passes
+next_puzzle = None
+
+# Player columns compared when a refresh is diffed against the stored roster
+PLAYER_FIELDS = ('name', 'position', 'nationality', 'age', 'team', 'league', 'appearances',
+                 'starts', 'market_value', 'market_value_display', 'search_key', 'phonetic_keys')
+
+# Fields no response shows; a refresh that only changes these keeps every cache
+HIDDEN_PLAYER_FIELDS = frozenset({'appearances', 'starts'})
+
+# Row ids touched by a refresh, plus how many rows were left alone and which fields changed
+RosterChanges = namedtuple('RosterChanges', ['inserted', 'updated', 'deleted', 'unchanged', 'fields'])
+
+# Identical concurrent searches and guesses share one computation
+search_flight = SingleFlight()
+guess_flight = SingleFlight()
+
+# Serialized /api/players/index payload for the current search index
+roster_index_cache = None
+
+# Whether the database has the FTS5 search table (None until checked)
+fts_enabled = None
+
+# Idle read-only connections as (database path, connection), see read_db()
+read_pool = []
+read_pool_lock = threading.Lock()
+
+# The single read-write connection as (database path, connection), see write_db()
+writer = None
+writer_lock = threading.RLock()
+
+def get_db(readonly=False):
+    """Get a new database connection, read-only through a mode=ro URI if asked"""
+    if readonly:
+        db = sqlite3.connect(f'file:{quote(os.path.abspath(DATABASE))}?mode=ro', uri=True,
+                             check_same_thread=False, cached_statements=SQLITE_STATEMENT_CACHE)
+    else:
+        db = sqlite3.connect(DATABASE, check_same_thread=False,
+                             cached_statements=SQLITE_STATEMENT_CACHE)
+        db.execute('PRAGMA journal_mode = WAL')
+    for pragma in SQLITE_PRAGMAS:
+        db.execute(pragma)
     db.row_factory = sqlite3.Row
     return db
 
+@contextmanager
+def read_db():
+    """Borrow a persistent read-only connection for the duration of a block
+
+    The dev server starts a thread per request, so connections are pooled
+    rather than kept in thread-locals; each thread holds one at most while
+    it reads, and its prepared statements survive for the next borrower.
+    """
+    path = DATABASE
+    db = None
+    with read_pool_lock:
+        while read_pool and db is None:
+            pooled_path, pooled = read_pool.pop()
+            if pooled_path == path:
+                db = pooled
+            else:
+                pooled.close()
+    if db is None:
+        db = get_db(readonly=True)
+    
+    try:
+        yield db
+    finally:
+        with read_pool_lock:
+            if len(read_pool) < READ_POOL_SIZE:
+                read_pool.append((path, db))
+                db = None
+        if db is not None:
+            db.close()
+
+@contextmanager
+def write_db():
+    """Get the process-wide read-write connection, one writer at a time
+
+    Commits when the block finishes and rolls back if it raises. WAL lets
+    the read-only connections keep reading while a write is in progress.
+    """
+    global writer
+    
+    with writer_lock:
+        if writer is None or writer[0] != DATABASE:
+            if writer is not None:
+                writer[1].close()
+            writer = (DATABASE, get_db())
+        db = writer[1]
+        try:
+            yield db
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+
 def setup_database():
     """Create database tables if they don't exist"""
-    with get_db() as db:
-        # Drop existing table to ensure schema consistency
-        db.execute('DROP TABLE IF EXISTS players')
+    with write_db() as db:
+        # Refreshes are diffed on player_key; a table from before it is rebuilt
+        columns = {row['name'] for row in db.execute('PRAGMA table_info(players)')}
+        if columns and 'player_key' not in columns:
+            db.execute('DROP TABLE players')
         
         db.execute('''
-        CREATE TABLE players (
+        CREATE TABLE IF NOT EXISTS players (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_key TEXT NOT NULL UNIQUE,
             name TEXT NOT NULL,
             position TEXT,
             nationality TEXT,
@@ -44,2863 +228,223 @@ def setup_database():
             starts INTEGER,
             market_value INTEGER,
             market_value_display TEXT,
-            last_updated TEXT
+            last_updated TEXT,
+            search_key TEXT NOT NULL DEFAULT '',
+            phonetic_keys TEXT NOT NULL DEFAULT ''
         )
         ''')
-        db.commit()
-
-def get_premier_league_players():
-    """Get relevant players from Premier League"""
-    # Comprehensive database of Premier League players
-    # Criteria: 15+ appearances OR €10M+ market value
-    players_data = [
-        # ARSENAL
-        {
-            'name': 'Bukayo Saka',
-            'position': 'Right Wing',
-            'nationality': 'England',
-            'age': 22,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 34,
-            'market_value': 120000000,
-            'market_value_display': '€120M'
-        },
-        {
-            'name': 'Martin Odegaard',
-            'position': 'Attacking Midfield',
-            'nationality': 'Norway',
-            'age': 25,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 34,
-            'market_value': 110000000,
-            'market_value_display': '€110M'
-        },
-        {
-            'name': 'William Saliba',
-            'position': 'Centre-Back',
-            'nationality': 'France',
-            'age': 23,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Declan Rice',
-            'position': 'Defensive Midfield',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 37,
-            'market_value': 100000000,
-            'market_value_display': '€100M'
-        },
-        {
-            'name': 'Kai Havertz',
-            'position': 'Centre-Forward',
-            'nationality': 'Germany',
-            'age': 25,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 30,
-            'market_value': 70000000,
-            'market_value_display': '€70M'
-        },
-        {
-            'name': 'Gabriel Martinelli',
-            'position': 'Left Wing',
-            'nationality': 'Brazil',
-            'age': 23,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 28,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Ben White',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 37,
-            'market_value': 55000000,
-            'market_value_display': '€55M'
-        },
-        {
-            'name': 'Gabriel Magalhaes',
-            'position': 'Centre-Back',
-            'nationality': 'Brazil',
-            'age': 26,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 34,
-            'starts': 34,
-            'market_value': 65000000,
-            'market_value_display': '€65M'
-        },
-        {
-            'name': 'Oleksandr Zinchenko',
-            'position': 'Left-Back',
-            'nationality': 'Ukraine',
-            'age': 27,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 18,
-            'market_value': 42000000,
-            'market_value_display': '€42M'
-        },
-        {
-            'name': 'Jakub Kiwior',
-            'position': 'Centre-Back',
-            'nationality': 'Poland',
-            'age': 24,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 15,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Takehiro Tomiyasu',
-            'position': 'Right-Back',
-            'nationality': 'Japan',
-            'age': 25,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 18,
-            'starts': 12,
-            'market_value': 30000000,
-            'market_value_display': '€30M'
-        },
-        {
-            'name': 'Jorginho',
-            'position': 'Central Midfield',
-            'nationality': 'Italy',
-            'age': 32,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 20,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Leandro Trossard',
-            'position': 'Left Wing',
-            'nationality': 'Belgium',
-            'age': 29,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 34,
-            'starts': 15,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'David Raya',
-            'position': 'Goalkeeper',
-            'nationality': 'Spain',
-            'age': 28,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 32,
-            'market_value': 30000000,
-            'market_value_display': '€30M'
-        },
-        {
-            'name': 'Aaron Ramsdale',
-            'position': 'Goalkeeper',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 6,
-            'starts': 6,
-            'market_value': 28000000,
-            'market_value_display': '€28M'
-        },
+        # Supports the exact and prefix tiers of the SQL search as range scans
+        db.execute('CREATE INDEX IF NOT EXISTS idx_players_search_key ON players (search_key)')
         
-        # ASTON VILLA
-        {
-            'name': 'Ollie Watkins',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 28,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 37,
-            'market_value': 65000000,
-            'market_value_display': '€65M'
-        },
-        {
-            'name': 'Douglas Luiz',
-            'position': 'Central Midfield',
-            'nationality': 'Brazil',
-            'age': 26,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 60000000,
-            'market_value_display': '€60M'
-        },
-        {
-            'name': 'Leon Bailey',
-            'position': 'Right Wing',
-            'nationality': 'Jamaica',
-            'age': 26,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 25,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'John McGinn',
-            'position': 'Central Midfield',
-            'nationality': 'Scotland',
-            'age': 29,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 34,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Ezri Konsa',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Emiliano Martinez',
-            'position': 'Goalkeeper',
-            'nationality': 'Argentina',
-            'age': 31,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 28000000,
-            'market_value_display': '€28M'
-        },
-        {
-            'name': 'Pau Torres',
-            'position': 'Centre-Back',
-            'nationality': 'Spain',
-            'age': 27,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 33,
-            'starts': 32,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Lucas Digne',
-            'position': 'Left-Back',
-            'nationality': 'France',
-            'age': 30,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 24,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Matty Cash',
-            'position': 'Right-Back',
-            'nationality': 'Poland',
-            'age': 26,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 27,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Moussa Diaby',
-            'position': 'Right Wing',
-            'nationality': 'France',
-            'age': 25,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 30,
-            'market_value': 50000000,
-            'market_value_display': '€50M'
-        },
-        {
-            'name': 'Youri Tielemans',
-            'position': 'Central Midfield',
-            'nationality': 'Belgium',
-            'age': 27,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 20,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Nicolo Zaniolo',
-            'position': 'Attacking Midfield',
-            'nationality': 'Italy',
-            'age': 25,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 12,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        
-        # BOURNEMOUTH
-        {
-            'name': 'Dominic Solanke',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 40000000,
-            'market_value_display': '€40M'
-        },
-        {
-            'name': 'Philip Billing',
-            'position': 'Central Midfield',
-            'nationality': 'Denmark',
-            'age': 28,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 30,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Neto',
-            'position': 'Goalkeeper',
-            'nationality': 'Brazil',
-            'age': 34,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 37,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Marcus Tavernier',
-            'position': 'Right Wing',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 22000000,
-            'market_value_display': '€22M'
-        },
-        {
-            'name': 'Ryan Christie',
-            'position': 'Attacking Midfield',
-            'nationality': 'Scotland',
-            'age': 29,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 32,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Lloyd Kelly',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 24,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Adam Smith',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 33,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 27,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Milos Kerkez',
-            'position': 'Left-Back',
-            'nationality': 'Hungary',
-            'age': 20,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 29,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Justin Kluivert',
-            'position': 'Left Wing',
-            'nationality': 'Netherlands',
-            'age': 25,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 25,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        
-        # BRENTFORD
-        {
-            'name': 'Ivan Toney',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 28,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 17,
-            'starts': 17,
-            'market_value': 50000000,
-            'market_value_display': '€50M'
-        },
-        {
-            'name': 'Bryan Mbeumo',
-            'position': 'Right Wing',
-            'nationality': 'Cameroon',
-            'age': 24,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 24,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Yoane Wissa',
-            'position': 'Left Wing',
-            'nationality': 'DR Congo',
-            'age': 27,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 30,
-            'market_value': 30000000,
-            'market_value_display': '€30M'
-        },
-        {
-            'name': 'Mark Flekken',
-            'position': 'Goalkeeper',
-            'nationality': 'Netherlands',
-            'age': 30,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Christian Norgaard',
-            'position': 'Defensive Midfield',
-            'nationality': 'Denmark',
-            'age': 30,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 28,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Mathias Jensen',
-            'position': 'Central Midfield',
-            'nationality': 'Denmark',
-            'age': 28,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 33,
-            'market_value': 22000000,
-            'market_value_display': '€22M'
-        },
-        {
-            'name': 'Vitaly Janelt',
-            'position': 'Central Midfield',
-            'nationality': 'Germany',
-            'age': 25,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 28,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Ethan Pinnock',
-            'position': 'Centre-Back',
-            'nationality': 'Jamaica',
-            'age': 31,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Nathan Collins',
-            'position': 'Centre-Back',
-            'nationality': 'Ireland',
-            'age': 23,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 29,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Aaron Hickey',
-            'position': 'Right-Back',
-            'nationality': 'Scotland',
-            'age': 22,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 19,
-            'starts': 18,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Rico Henry',
-            'position': 'Left-Back',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 15,
-            'starts': 15,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Neal Maupay',
-            'position': 'Centre-Forward',
-            'nationality': 'France',
-            'age': 27,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        
-        # BRIGHTON
-        {
-            'name': 'Evan Ferguson',
-            'position': 'Centre-Forward',
-            'nationality': 'Ireland',
-            'age': 19,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 65000000,
-            'market_value_display': '€65M'
-        },
-        {
-            'name': 'Joao Pedro',
-            'position': 'Centre-Forward',
-            'nationality': 'Brazil',
-            'age': 22,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 20,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Simon Adingra',
-            'position': 'Left Wing',
-            'nationality': 'Ivory Coast',
-            'age': 22,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 27,
-            'starts': 18,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Pascal Gross',
-            'position': 'Central Midfield',
-            'nationality': 'Germany',
-            'age': 32,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 37,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Bart Verbruggen',
-            'position': 'Goalkeeper',
-            'nationality': 'Netherlands',
-            'age': 21,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 27,
-            'starts': 27,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Jason Steele',
-            'position': 'Goalkeeper',
-            'nationality': 'England',
-            'age': 33,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 11,
-            'starts': 11,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Lewis Dunk',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 32,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Jan Paul van Hecke',
-            'position': 'Centre-Back',
-            'nationality': 'Netherlands',
-            'age': 23,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Tariq Lamptey',
-            'position': 'Right-Back',
-            'nationality': 'Ghana',
-            'age': 23,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 12,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Pervis Estupinan',
-            'position': 'Left-Back',
-            'nationality': 'Ecuador',
-            'age': 26,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 20,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Billy Gilmour',
-            'position': 'Central Midfield',
-            'nationality': 'Scotland',
-            'age': 23,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Carlos Baleba',
-            'position': 'Defensive Midfield',
-            'nationality': 'Cameroon',
-            'age': 20,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 22,
-            'starts': 15,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Facundo Buonanotte',
-            'position': 'Attacking Midfield',
-            'nationality': 'Argentina',
-            'age': 19,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 12,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Kaoru Mitoma',
-            'position': 'Left Wing',
-            'nationality': 'Japan',
-            'age': 27,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 19,
-            'starts': 18,
-            'market_value': 50000000,
-            'market_value_display': '€50M'
-        },
-        {
-            'name': 'Danny Welbeck',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 33,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        
-        # BURNLEY
-        {
-            'name': 'Lyle Foster',
-            'position': 'Centre-Forward',
-            'nationality': 'South Africa',
-            'age': 24,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 24,
-            'starts': 20,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'James Trafford',
-            'position': 'Goalkeeper',
-            'nationality': 'England',
-            'age': 21,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 28,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Dara OShea',
-            'position': 'Centre-Back',
-            'nationality': 'Ireland',
-            'age': 25,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 30,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Jordan Beyer',
-            'position': 'Centre-Back',
-            'nationality': 'Germany',
-            'age': 23,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 25,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Connor Roberts',
-            'position': 'Right-Back',
-            'nationality': 'Wales',
-            'age': 28,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 24,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Charlie Taylor',
-            'position': 'Left-Back',
-            'nationality': 'England',
-            'age': 30,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 27,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Josh Cullen',
-            'position': 'Central Midfield',
-            'nationality': 'Ireland',
-            'age': 28,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Sander Berge',
-            'position': 'Central Midfield',
-            'nationality': 'Norway',
-            'age': 26,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 30,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Wilson Odobert',
-            'position': 'Left Wing',
-            'nationality': 'France',
-            'age': 19,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 25,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Zeki Amdouni',
-            'position': 'Centre-Forward',
-            'nationality': 'Switzerland',
-            'age': 23,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 25,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Jacob Bruun Larsen',
-            'position': 'Right Wing',
-            'nationality': 'Denmark',
-            'age': 25,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Martin Odegaard',
-            'position': 'Attacking Midfield',
-            'nationality': 'Norway',
-            'age': 25,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 34,
-            'market_value': 110000000,
-            'market_value_display': '€110M'
-        },
-        {
-            'name': 'William Saliba',
-            'position': 'Centre-Back',
-            'nationality': 'France',
-            'age': 23,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Declan Rice',
-            'position': 'Defensive Midfield',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 37,
-            'market_value': 100000000,
-            'market_value_display': '€100M'
-        },
-        {
-            'name': 'Kai Havertz',
-            'position': 'Centre-Forward',
-            'nationality': 'Germany',
-            'age': 25,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 30,
-            'market_value': 70000000,
-            'market_value_display': '€70M'
-        },
-        {
-            'name': 'Gabriel Martinelli',
-            'position': 'Left Wing',
-            'nationality': 'Brazil',
-            'age': 23,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 28,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Ben White',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 37,
-            'market_value': 55000000,
-            'market_value_display': '€55M'
-        },
-        {
-            'name': 'Gabriel Magalhaes',
-            'position': 'Centre-Back',
-            'nationality': 'Brazil',
-            'age': 26,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 34,
-            'starts': 34,
-            'market_value': 65000000,
-            'market_value_display': '€65M'
-        },
-        {
-            'name': 'Oleksandr Zinchenko',
-            'position': 'Left-Back',
-            'nationality': 'Ukraine',
-            'age': 27,
-            'team': 'Arsenal',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 18,
-            'market_value': 42000000,
-            'market_value_display': '€42M'
-        },
-        
-        # ASTON VILLA
-        {
-            'name': 'Ollie Watkins',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 28,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 37,
-            'market_value': 65000000,
-            'market_value_display': '€65M'
-        },
-        {
-            'name': 'Douglas Luiz',
-            'position': 'Central Midfield',
-            'nationality': 'Brazil',
-            'age': 26,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 60000000,
-            'market_value_display': '€60M'
-        },
-        {
-            'name': 'Leon Bailey',
-            'position': 'Right Wing',
-            'nationality': 'Jamaica',
-            'age': 26,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 25,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'John McGinn',
-            'position': 'Central Midfield',
-            'nationality': 'Scotland',
-            'age': 29,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 34,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Ezri Konsa',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Aston Villa',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        
-        # BOURNEMOUTH
-        {
-            'name': 'Dominic Solanke',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 40000000,
-            'market_value_display': '€40M'
-        },
-        {
-            'name': 'Philip Billing',
-            'position': 'Central Midfield',
-            'nationality': 'Denmark',
-            'age': 28,
-            'team': 'Bournemouth',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 30,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        
-        # BRENTFORD
-        {
-            'name': 'Ivan Toney',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 28,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 17,
-            'starts': 17,
-            'market_value': 50000000,
-            'market_value_display': '€50M'
-        },
-        {
-            'name': 'Bryan Mbeumo',
-            'position': 'Right Wing',
-            'nationality': 'Cameroon',
-            'age': 24,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 24,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Yoane Wissa',
-            'position': 'Left Wing',
-            'nationality': 'DR Congo',
-            'age': 27,
-            'team': 'Brentford',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 30,
-            'market_value': 30000000,
-            'market_value_display': '€30M'
-        },
-        
-        # BRIGHTON
-        {
-            'name': 'Evan Ferguson',
-            'position': 'Centre-Forward',
-            'nationality': 'Ireland',
-            'age': 19,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 65000000,
-            'market_value_display': '€65M'
-        },
-        {
-            'name': 'Joao Pedro',
-            'position': 'Centre-Forward',
-            'nationality': 'Brazil',
-            'age': 22,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 20,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Simon Adingra',
-            'position': 'Left Wing',
-            'nationality': 'Ivory Coast',
-            'age': 22,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 27,
-            'starts': 18,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Pascal Gross',
-            'position': 'Central Midfield',
-            'nationality': 'Germany',
-            'age': 32,
-            'team': 'Brighton',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 37,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        
-        # BURNLEY
-        {
-            'name': 'Lyle Foster',
-            'position': 'Centre-Forward',
-            'nationality': 'South Africa',
-            'age': 24,
-            'team': 'Burnley',
-            'league': 'Premier League',
-            'appearances': 24,
-            'starts': 20,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        
-        # CHELSEA
-        {
-            'name': 'Cole Palmer',
-            'position': 'Right Wing',
-            'nationality': 'England',
-            'age': 22,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 33,
-            'starts': 30,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Enzo Fernandez',
-            'position': 'Central Midfield',
-            'nationality': 'Argentina',
-            'age': 23,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 31,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Moises Caicedo',
-            'position': 'Defensive Midfield',
-            'nationality': 'Ecuador',
-            'age': 22,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 33,
-            'starts': 32,
-            'market_value': 90000000,
-            'market_value_display': '€90M'
-        },
-        {
-            'name': 'Nicolas Jackson',
-            'position': 'Centre-Forward',
-            'nationality': 'Senegal',
-            'age': 23,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 30,
-            'market_value': 55000000,
-            'market_value_display': '€55M'
-        },
-        {
-            'name': 'Conor Gallagher',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 24,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 35,
-            'market_value': 42000000,
-            'market_value_display': '€42M'
-        },
-        {
-            'name': 'Malo Gusto',
-            'position': 'Right-Back',
-            'nationality': 'France',
-            'age': 20,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 23,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Robert Sanchez',
-            'position': 'Goalkeeper',
-            'nationality': 'Spain',
-            'age': 26,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 20,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Djordje Petrovic',
-            'position': 'Goalkeeper',
-            'nationality': 'Serbia',
-            'age': 24,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 18,
-            'starts': 18,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Thiago Silva',
-            'position': 'Centre-Back',
-            'nationality': 'Brazil',
-            'age': 39,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 27,
-            'starts': 27,
-            'market_value': 2000000,
-            'market_value_display': '€2M'
-        },
-        {
-            'name': 'Axel Disasi',
-            'position': 'Centre-Back',
-            'nationality': 'France',
-            'age': 26,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Levi Colwill',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 21,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 30,
-            'market_value': 55000000,
-            'market_value_display': '€55M'
-        },
-        {
-            'name': 'Ben Chilwell',
-            'position': 'Left-Back',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 13,
-            'starts': 12,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Marc Cucurella',
-            'position': 'Left-Back',
-            'nationality': 'Spain',
-            'age': 26,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 18,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Raheem Sterling',
-            'position': 'Left Wing',
-            'nationality': 'England',
-            'age': 29,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 31,
-            'starts': 28,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Mykhailo Mudryk',
-            'position': 'Left Wing',
-            'nationality': 'Ukraine',
-            'age': 23,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 40000000,
-            'market_value_display': '€40M'
-        },
-        {
-            'name': 'Noni Madueke',
-            'position': 'Right Wing',
-            'nationality': 'England',
-            'age': 22,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 30000000,
-            'market_value_display': '€30M'
-        },
-        {
-            'name': 'Christopher Nkunku',
-            'position': 'Centre-Forward',
-            'nationality': 'France',
-            'age': 26,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 10,
-            'starts': 8,
-            'market_value': 60000000,
-            'market_value_display': '€60M'
-        },
-        {
-            'name': 'Armando Broja',
-            'position': 'Centre-Forward',
-            'nationality': 'Albania',
-            'age': 22,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 15,
-            'starts': 8,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Lesley Ugochukwu',
-            'position': 'Defensive Midfield',
-            'nationality': 'France',
-            'age': 20,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 15,
-            'starts': 8,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Romeo Lavia',
-            'position': 'Defensive Midfield',
-            'nationality': 'Belgium',
-            'age': 20,
-            'team': 'Chelsea',
-            'league': 'Premier League',
-            'appearances': 1,
-            'starts': 1,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
+        # Roster-wide facts such as when it was last refreshed
+        db.execute('''
+        CREATE TABLE IF NOT EXISTS roster_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''')
         
-        # CRYSTAL PALACE
-        {
-            'name': 'Eberechi Eze',
-            'position': 'Attacking Midfield',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 27,
-            'starts': 25,
-            'market_value': 50000000,
-            'market_value_display': '€50M'
-        },
-        {
-            'name': 'Michael Olise',
-            'position': 'Right Wing',
-            'nationality': 'France',
-            'age': 22,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 19,
-            'starts': 18,
-            'market_value': 55000000,
-            'market_value_display': '€55M'
-        },
-        {
-            'name': 'Jean-Philippe Mateta',
-            'position': 'Centre-Forward',
-            'nationality': 'France',
-            'age': 27,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 25,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Sam Johnstone',
-            'position': 'Goalkeeper',
-            'nationality': 'England',
-            'age': 31,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 20,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Dean Henderson',
-            'position': 'Goalkeeper',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 18,
-            'starts': 18,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Joachim Andersen',
-            'position': 'Centre-Back',
-            'nationality': 'Denmark',
-            'age': 28,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Marc Guehi',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 23,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 30,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Nathaniel Clyne',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 33,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 25,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Daniel Munoz',
-            'position': 'Right-Back',
-            'nationality': 'Colombia',
-            'age': 28,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 12,
-            'starts': 12,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Tyrick Mitchell',
-            'position': 'Left-Back',
-            'nationality': 'England',
-            'age': 24,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 30,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Cheick Doucoure',
-            'position': 'Defensive Midfield',
-            'nationality': 'Mali',
-            'age': 24,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 15,
-            'starts': 15,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Will Hughes',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 29,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Jefferson Lerma',
-            'position': 'Central Midfield',
-            'nationality': 'Colombia',
-            'age': 29,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Jordan Ayew',
-            'position': 'Right Wing',
-            'nationality': 'Ghana',
-            'age': 32,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 30,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Odsonne Edouard',
-            'position': 'Centre-Forward',
-            'nationality': 'France',
-            'age': 26,
-            'team': 'Crystal Palace',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
+        # One answer per date; the name lets the schedule survive roster refreshes
+        db.execute('''
+        CREATE TABLE IF NOT EXISTS daily_puzzles (
+            date TEXT PRIMARY KEY,
+            player_id INTEGER NOT NULL,
+            player_name TEXT NOT NULL
+        )
+        ''')
         
-        # EVERTON
-        {
-            'name': 'Jarrad Branthwaite',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 22,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Dominic Calvert-Lewin',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 30,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Abdoulaye Doucoure',
-            'position': 'Central Midfield',
-            'nationality': 'Mali',
-            'age': 31,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 30,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Jordan Pickford',
-            'position': 'Goalkeeper',
-            'nationality': 'England',
-            'age': 30,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'James Tarkowski',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 31,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Vitalii Mykolenko',
-            'position': 'Left-Back',
-            'nationality': 'Ukraine',
-            'age': 25,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 30,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Seamus Coleman',
-            'position': 'Right-Back',
-            'nationality': 'Ireland',
-            'age': 35,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 20,
-            'market_value': 5000000,
-            'market_value_display': '€5M'
-        },
-        {
-            'name': 'Ashley Young',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 38,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 18,
-            'starts': 18,
-            'market_value': 2000000,
-            'market_value_display': '€2M'
-        },
-        {
-            'name': 'Idrissa Gueye',
-            'position': 'Defensive Midfield',
-            'nationality': 'Senegal',
-            'age': 34,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Amadou Onana',
-            'position': 'Defensive Midfield',
-            'nationality': 'Belgium',
-            'age': 22,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 50000000,
-            'market_value_display': '€50M'
-        },
-        {
-            'name': 'James Garner',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 23,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Jack Harrison',
-            'position': 'Left Wing',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Dwight McNeil',
-            'position': 'Left Wing',
-            'nationality': 'England',
-            'age': 24,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 32,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Beto',
-            'position': 'Centre-Forward',
-            'nationality': 'Portugal',
-            'age': 26,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Arnaut Danjuma',
-            'position': 'Left Wing',
-            'nationality': 'Netherlands',
-            'age': 27,
-            'team': 'Everton',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 10,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
+        # Nicknames refer to players by name so they survive roster refreshes
+        db.execute('''
+        CREATE TABLE IF NOT EXISTS player_aliases (
+            alias TEXT NOT NULL,
+            alias_key TEXT NOT NULL,
+            player_name TEXT NOT NULL,
+            PRIMARY KEY (alias_key, player_name)
+        )
+        ''')
         
-        # FULHAM
-        {
-            'name': 'Joao Palhinha',
-            'position': 'Defensive Midfield',
-            'nationality': 'Portugal',
-            'age': 28,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 33,
-            'starts': 33,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Andreas Pereira',
-            'position': 'Attacking Midfield',
-            'nationality': 'Brazil',
-            'age': 28,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 33,
-            'starts': 32,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Willian',
-            'position': 'Left Wing',
-            'nationality': 'Brazil',
-            'age': 35,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Bernd Leno',
-            'position': 'Goalkeeper',
-            'nationality': 'Germany',
-            'age': 32,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 38,
-            'starts': 38,
-            'market_value': 18000000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Tosin Adarabioyo',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 25,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Calvin Bassey',
-            'position': 'Centre-Back',
-            'nationality': 'Nigeria',
-            'age': 24,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 22,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Issa Diop',
-            'position': 'Centre-Back',
-            'nationality': 'France',
-            'age': 27,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 18,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Kenny Tete',
-            'position': 'Right-Back',
-            'nationality': 'Netherlands',
-            'age': 28,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 25,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Antonee Robinson',
-            'position': 'Left-Back',
-            'nationality': 'USA',
-            'age': 26,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Harrison Reed',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 29,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 25,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Tom Cairney',
-            'position': 'Central Midfield',
-            'nationality': 'Scotland',
-            'age': 33,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Alex Iwobi',
-            'position': 'Right Wing',
-            'nationality': 'Nigeria',
-            'age': 28,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 32,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Bobby De Cordova-Reid',
-            'position': 'Right Wing',
-            'nationality': 'Jamaica',
-            'age': 31,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 30,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Raul Jimenez',
-            'position': 'Centre-Forward',
-            'nationality': 'Mexico',
-            'age': 33,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Rodrigo Muniz',
-            'position': 'Centre-Forward',
-            'nationality': 'Brazil',
-            'age': 23,
-            'team': 'Fulham',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 15,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
+        # Append-only record of every valid guess, for analytics
+        db.execute('''
+        CREATE TABLE IF NOT EXISTS guess_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL,
+            session_id TEXT,
+            guess_number INTEGER,
+            player_id INTEGER NOT NULL,
+            correct INTEGER NOT NULL,
+            created_at REAL NOT NULL
+        )
+        ''')
         
-        # LIVERPOOL
-        {
-            'name': 'Mohamed Salah',
-            'position': 'Right Wing',
-            'nationality': 'Egypt',
-            'age': 32,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 31,
-            'market_value': 65000000,
-            'market_value_display': '€65M'
-        },
-        {
-            'name': 'Virgil van Dijk',
-            'position': 'Centre-Back',
-            'nationality': 'Netherlands',
-            'age': 33,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 36,
-            'starts': 36,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Darwin Nunez',
-            'position': 'Centre-Forward',
-            'nationality': 'Uruguay',
-            'age': 25,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 36,
-            'starts': 25,
-            'market_value': 70000000,
-            'market_value_display': '€70M'
-        },
-        {
-            'name': 'Luis Diaz',
-            'position': 'Left Wing',
-            'nationality': 'Colombia',
-            'age': 27,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 36,
-            'starts': 32,
-            'market_value': 75000000,
-            'market_value_display': '€75M'
-        },
-        {
-            'name': 'Trent Alexander-Arnold',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 28,
-            'market_value': 70000000,
-            'market_value_display': '€70M'
-        },
-        {
-            'name': 'Andy Robertson',
-            'position': 'Left-Back',
-            'nationality': 'Scotland',
-            'age': 30,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 23,
-            'starts': 22,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Alisson',
-            'position': 'Goalkeeper',
-            'nationality': 'Brazil',
-            'age': 31,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 28,
-            'market_value': 32000000,
-            'market_value_display': '€32M'
-        },
-        {
-            'name': 'Caoimhin Kelleher',
-            'position': 'Goalkeeper',
-            'nationality': 'Ireland',
-            'age': 25,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 10,
-            'starts': 10,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Ibrahima Konate',
-            'position': 'Centre-Back',
-            'nationality': 'France',
-            'age': 25,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 25,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Joel Matip',
-            'position': 'Centre-Back',
-            'nationality': 'Cameroon',
-            'age': 32,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 10,
-            'starts': 9,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Joe Gomez',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 25,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Kostas Tsimikas',
-            'position': 'Left-Back',
-            'nationality': 'Greece',
-            'age': 28,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 15,
-            'starts': 13,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Conor Bradley',
-            'position': 'Right-Back',
-            'nationality': 'Northern Ireland',
-            'age': 20,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 10,
-            'starts': 10,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Alexis Mac Allister',
-            'position': 'Central Midfield',
-            'nationality': 'Argentina',
-            'age': 25,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 33,
-            'market_value': 70000000,
-            'market_value_display': '€70M'
-        },
-        {
-            'name': 'Dominik Szoboszlai',
-            'position': 'Central Midfield',
-            'nationality': 'Hungary',
-            'age': 23,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 28,
-            'starts': 28,
-            'market_value': 75000000,
-            'market_value_display': '€75M'
-        },
-        {
-            'name': 'Wataru Endo',
-            'position': 'Defensive Midfield',
-            'nationality': 'Japan',
-            'age': 31,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Curtis Jones',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 23,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Harvey Elliott',
-            'position': 'Right Wing',
-            'nationality': 'England',
-            'age': 21,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 20,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Cody Gakpo',
-            'position': 'Centre-Forward',
-            'nationality': 'Netherlands',
-            'age': 25,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 25,
-            'market_value': 55000000,
-            'market_value_display': '€55M'
-        },
-        {
-            'name': 'Diogo Jota',
-            'position': 'Left Wing',
-            'nationality': 'Portugal',
-            'age': 27,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 15,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Ryan Gravenberch',
-            'position': 'Central Midfield',
-            'nationality': 'Netherlands',
-            'age': 22,
-            'team': 'Liverpool',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
+        # Checkpoints of the running daily stats, covering events up to last_event_id.
+        # They can always be replayed from guess_events, so one from before
+        # sessions were saved is simply dropped
+        columns = {row['name'] for row in db.execute('PRAGMA table_info(daily_stats)')}
+        if columns and 'sessions' not in columns:
+            db.execute('DROP TABLE daily_stats')
+        db.execute('''
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            date TEXT PRIMARY KEY,
+            started INTEGER NOT NULL,
+            solved INTEGER NOT NULL,
+            guesses INTEGER NOT NULL,
+            solve_guesses INTEGER NOT NULL,
+            histogram TEXT NOT NULL,
+            wrong_guesses TEXT NOT NULL,
+            sessions TEXT NOT NULL,
+            last_event_id INTEGER NOT NULL
+        )
+        ''')
+        db.commit()
+    
+    setup_fts()
+
+def setup_fts():
+    """Create the optional FTS5 mirror of the players table and its sync triggers"""
+    global fts_enabled
+    
+    with write_db() as db:
+        db.execute('DROP TABLE IF EXISTS players_fts')
+        try:
+            db.execute('''
+            CREATE VIRTUAL TABLE players_fts USING fts5(
+                search_key, team, nationality,
+                content='players', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 unavailable, falling back to in-memory search: {e}")
+            fts_enabled = False
+            return
         
-        # LUTON TOWN
-        {
-            'name': 'Carlton Morris',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 28,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 35,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Thomas Kaminski',
-            'position': 'Goalkeeper',
-            'nationality': 'Belgium',
-            'age': 31,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Teden Mengi',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 22,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 30,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Gabriel Osho',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 25,
-            'market_value': 10000000,
-            'market_value_display': '€10M'
-        },
-        {
-            'name': 'Alfie Doughty',
-            'position': 'Left-Back',
-            'nationality': 'England',
-            'age': 24,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Ross Barkley',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 30,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 30,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Albert Sambi Lokonga',
-            'position': 'Central Midfield',
-            'nationality': 'Belgium',
-            'age': 24,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 15,
-            'starts': 15,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Jordan Clark',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 30,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 8000000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Chiedozie Ogbene',
-            'position': 'Right Wing',
-            'nationality': 'Ireland',
-            'age': 26,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 32,
-            'market_value': 12000000,
-            'market_value_display': '€12M'
-        },
-        {
-            'name': 'Elijah Adebayo',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 10000000,
-            'market_value_display': '€10M'
-        },
-        {
-            'name': 'Tahith Chong',
-            'position': 'Left Wing',
-            'nationality': 'Netherlands',
-            'age': 24,
-            'team': 'Luton Town',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 25,
-            'market_value': 10000000,
-            'market_value_display': '€10M'
-        },
+        db.executescript('''
+        CREATE TRIGGER IF NOT EXISTS players_fts_insert AFTER INSERT ON players BEGIN
+            INSERT INTO players_fts (rowid, search_key, team, nationality)
+            VALUES (new.id, new.search_key, new.team, new.nationality);
+        END;
+        CREATE TRIGGER IF NOT EXISTS players_fts_delete AFTER DELETE ON players BEGIN
+            INSERT INTO players_fts (players_fts, rowid, search_key, team, nationality)
+            VALUES ('delete', old.id, old.search_key, old.team, old.nationality);
+        END;
+        CREATE TRIGGER IF NOT EXISTS players_fts_update AFTER UPDATE ON players BEGIN
+            INSERT INTO players_fts (players_fts, rowid, search_key, team, nationality)
+            VALUES ('delete', old.id, old.search_key, old.team, old.nationality);
+            INSERT INTO players_fts (rowid, search_key, team, nationality)
+            VALUES (new.id, new.search_key, new.team, new.nationality);
+        END;
+        ''')
         
-        # MANCHESTER CITY
-        {
-            'name': 'Erling Haaland',
-            'position': 'Centre-Forward',
-            'nationality': 'Norway',
-            'age': 24,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 33,
-            'market_value': 180000000,
-            'market_value_display': '€180M'
-        },
-        {
-            'name': 'Kevin De Bruyne',
-            'position': 'Attacking Midfield',
-            'nationality': 'Belgium',
-            'age': 33,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 18,
-            'starts': 15,
-            'market_value': 60000000,
-            'market_value_display': '€60M'
-        },
-        {
-            'name': 'Phil Foden',
-            'position': 'Right Wing',
-            'nationality': 'England',
-            'age': 24,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 32,
-            'market_value': 130000000,
-            'market_value_display': '€130M'
-        },
-        {
-            'name': 'Ruben Dias',
-            'position': 'Centre-Back',
-            'nationality': 'Portugal',
-            'age': 27,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 29,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Rodri',
-            'position': 'Defensive Midfield',
-            'nationality': 'Spain',
-            'age': 28,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 34,
-            'starts': 33,
-            'market_value': 110000000,
-            'market_value_display': '€110M'
-        },
-        {
-            'name': 'Bernardo Silva',
-            'position': 'Right Wing',
-            'nationality': 'Portugal',
-            'age': 29,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 32,
-            'market_value': 80000000,
-            'market_value_display': '€80M'
-        },
-        {
-            'name': 'Jack Grealish',
-            'position': 'Left Wing',
-            'nationality': 'England',
-            'age': 28,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 15,
-            'market_value': 55000000,
-            'market_value_display': '€55M'
-        },
-        {
-            'name': 'Ederson',
-            'position': 'Goalkeeper',
-            'nationality': 'Brazil',
-            'age': 30,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 35,
-            'market_value': 40000000,
-            'market_value_display': '€40M'
-        },
-        {
-            'name': 'Stefan Ortega',
-            'position': 'Goalkeeper',
-            'nationality': 'Germany',
-            'age': 31,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 3,
-            'starts': 3,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'John Stones',
-            'position': 'Centre-Back',
-            'nationality': 'England',
-            'age': 30,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 16,
-            'starts': 15,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Manuel Akanji',
-            'position': 'Centre-Back',
-            'nationality': 'Switzerland',
-            'age': 28,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Nathan Ake',
-            'position': 'Centre-Back',
-            'nationality': 'Netherlands',
-            'age': 29,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 22,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Kyle Walker',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 34,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 30,
-            'market_value': 15000000,
-            'market_value_display': '€15M'
-        },
-        {
-            'name': 'Rico Lewis',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 19,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 20,
-            'starts': 15,
-            'market_value': 35000000,
-            'market_value_display': '€35M'
-        },
-        {
-            'name': 'Josko Gvardiol',
-            'position': 'Left-Back',
-            'nationality': 'Croatia',
-            'age': 22,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 30,
-            'starts': 28,
-            'market_value': 75000000,
-            'market_value_display': '€75M'
-        },
-        {
-            'name': 'Matheus Nunes',
-            'position': 'Central Midfield',
-            'nationality': 'Portugal',
-            'age': 25,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 45000000,
-            'market_value_display': '€45M'
-        },
-        {
-            'name': 'Mateo Kovacic',
-            'position': 'Central Midfield',
-            'nationality': 'Croatia',
-            'age': 30,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 20,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        {
-            'name': 'Kalvin Phillips',
-            'position': 'Defensive Midfield',
-            'nationality': 'England',
-            'age': 28,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 4,
-            'starts': 2,
-            'market_value': 20000000,
-            'market_value_display': '€20M'
-        },
-        {
-            'name': 'Jeremy Doku',
-            'position': 'Left Wing',
-            'nationality': 'Belgium',
-            'age': 22,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 25,
-            'starts': 15,
-            'market_value': 50000000,
-            'market_value_display': '€50M'
-        },
-        {
-            'name': 'Julian Alvarez',
-            'position': 'Centre-Forward',
-            'nationality': 'Argentina',
-            'age': 24,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 35,
-            'starts': 25,
-            'market_value': 90000000,
-            'market_value_display': '€90M'
-        },
-        {
-            'name': 'Oscar Bobb',
-            'position': 'Right Wing',
-            'nationality': 'Norway',
-            'age': 20,
-            'team': 'Manchester City',
-            'league': 'Premier League',
-            'appearances': 15,
-            'starts': 8,
-            'market_value': 25000000,
-            'market_value_display': '€25M'
-        },
-        # Add Leicester City
-        {
-            'name': 'Kiernan Dewsbury-Hall',
-            'position': 'Central Midfield',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Leicester City',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 43,
-            'market_value': 28_000_000,
-            'market_value_display': '€28M'
-        },
-        {
-            'name': 'Jamie Vardy',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 37,
-            'team': 'Leicester City',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 20,
-            'market_value': 2_000_000,
-            'market_value_display': '€2M'
-        },
-        {
-            'name': 'Wout Faes',
-            'position': 'Centre-Back',
-            'nationality': 'Belgium',
-            'age': 26,
-            'team': 'Leicester City',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 44,
-            'market_value': 18_000_000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Mads Hermansen',
-            'position': 'Goalkeeper',
-            'nationality': 'Denmark',
-            'age': 24,
-            'team': 'Leicester City',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 44,
-            'market_value': 10_000_000,
-            'market_value_display': '€10M'
-        },
-        {
-            'name': 'Wilfred Ndidi',
-            'position': 'Defensive Midfield',
-            'nationality': 'Nigeria',
-            'age': 27,
-            'team': 'Leicester City',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 28,
-            'market_value': 16_000_000,
-            'market_value_display': '€16M'
-        },
-        {
-            'name': 'Stephy Mavididi',
-            'position': 'Left Wing',
-            'nationality': 'England',
-            'age': 26,
-            'team': 'Leicester City',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 41,
-            'market_value': 12_000_000,
-            'market_value_display': '€12M'
-        },
-        # Add Ipswich Town
-        {
-            'name': 'Leif Davis',
-            'position': 'Left-Back',
-            'nationality': 'England',
-            'age': 24,
-            'team': 'Ipswich Town',
-            'league': 'Premier League',
-            'appearances': 46,
-            'starts': 46,
-            'market_value': 10_000_000,
-            'market_value_display': '€10M'
-        },
-        {
-            'name': 'Conor Chaplin',
-            'position': 'Attacking Midfield',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Ipswich Town',
-            'league': 'Premier League',
-            'appearances': 46,
-            'starts': 44,
-            'market_value': 5_000_000,
-            'market_value_display': '€5M'
-        },
-        {
-            'name': 'Sam Morsy',
-            'position': 'Central Midfield',
-            'nationality': 'Egypt',
-            'age': 32,
-            'team': 'Ipswich Town',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 44,
-            'market_value': 2_000_000,
-            'market_value_display': '€2M'
-        },
-        {
-            'name': 'Vaclav Hladky',
-            'position': 'Goalkeeper',
-            'nationality': 'Czech Republic',
-            'age': 33,
-            'team': 'Ipswich Town',
-            'league': 'Premier League',
-            'appearances': 46,
-            'starts': 46,
-            'market_value': 1_000_000,
-            'market_value_display': '€1M'
-        },
-        {
-            'name': 'George Hirst',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Ipswich Town',
-            'league': 'Premier League',
-            'appearances': 32,
-            'starts': 25,
-            'market_value': 3_000_000,
-            'market_value_display': '€3M'
-        },
-        # Add Southampton
-        {
-            'name': 'Adam Armstrong',
-            'position': 'Centre-Forward',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Southampton',
-            'league': 'Premier League',
-            'appearances': 46,
-            'starts': 44,
-            'market_value': 10_000_000,
-            'market_value_display': '€10M'
-        },
-        {
-            'name': 'Kyle Walker-Peters',
-            'position': 'Right-Back',
-            'nationality': 'England',
-            'age': 27,
-            'team': 'Southampton',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 44,
-            'market_value': 18_000_000,
-            'market_value_display': '€18M'
-        },
-        {
-            'name': 'Gavin Bazunu',
-            'position': 'Goalkeeper',
-            'nationality': 'Ireland',
-            'age': 22,
-            'team': 'Southampton',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 44,
-            'market_value': 10_000_000,
-            'market_value_display': '€10M'
-        },
-        {
-            'name': 'Che Adams',
-            'position': 'Centre-Forward',
-            'nationality': 'Scotland',
-            'age': 28,
-            'team': 'Southampton',
-            'league': 'Premier League',
-            'appearances': 40,
-            'starts': 30,
-            'market_value': 10_000_000,
-            'market_value_display': '€10M'
-        },
-        {
-            'name': 'Will Smallbone',
-            'position': 'Central Midfield',
-            'nationality': 'Ireland',
-            'age': 24,
-            'team': 'Southampton',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 40,
-            'market_value': 6_000_000,
-            'market_value_display': '€6M'
-        },
-        {
-            'name': 'Jan Bednarek',
-            'position': 'Centre-Back',
-            'nationality': 'Poland',
-            'age': 28,
-            'team': 'Southampton',
-            'league': 'Premier League',
-            'appearances': 44,
-            'starts': 44,
-            'market_value': 8_000_000,
-            'market_value_display': '€8M'
-        },
-        {
-            'name': 'Flynn Downes',
-            'position': 'Defensive Midfield',
-            'nationality': 'England',
-            'age': 25,
-            'team': 'Southampton',
-            'league': 'Premier League',
-            'appearances': 37,
-            'starts': 35,
-            'market_value': 8_000_000,
-            'market_value_display': '€8M'
-        }
-    ]
+        # Index any rows that were written before the table existed
+        db.execute("INSERT INTO players_fts (players_fts) VALUES ('rebuild')")
+        db.commit()
+    
+    fts_enabled = True
+
+def has_fts(db):
+    """Check once per process whether the FTS5 search table exists"""
+    global fts_enabled
+    
+    if fts_enabled is None:
+        fts_enabled = db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'players_fts'"
+        ).fetchone() is not None
+    return fts_enabled
+
+def get_premier_league_players():
+    """Get relevant players from Premier League"""
+    # Criteria: 15+ appearances OR €10M+ market value
+    return list(iter_roster_file())
+
+def iter_roster_file(path=PLAYERS_FILE):
+    """Stream player dicts from the JSON Lines roster, one line at a time
+
+    The first line is a header with the format version and field names.
+    """
+    with open(path, encoding='utf-8') as f:
+        header = json.loads(next(f, '{}'))
+        if header.get('version') != PLAYERS_FILE_VERSION:
+            raise ValueError(f"{path}: unsupported roster version {header.get('version')!r}")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def fetch_api_players(known_teams=()):
+    """Fetch squads from football-data.org, filling in what the API lacks from the seed roster
+
+    The API has no appearances or market values, and only broad positions,
+    so those come from the seed player with the same name. Players the
+    seed doesn't know get a market value of 0; players without a birth
+    date or a position are skipped since both are part of every guess's
+    feedback.
+    Teams in `known_teams` that upstream reports unchanged are skipped;
+    returns a SquadFetch.
+    """
+    # Imported here so the static source doesn't need aiohttp
+    from football_data import fetch_squads
     
-    return players_data
+    fetched = fetch_squads(skip_unchanged=known_teams)
+    if not fetched.players:
+        return fetched
+    seed = {normalize_search_key(p['name']): p for p in iter_roster_file()}
+    players = []
+    for player in fetched.players:
+        if player['age'] is None:
+            continue
+        known = seed.get(normalize_search_key(player['name']))
+        if known:
+            for field in ('position', 'appearances', 'starts', 'market_value', 'market_value_display'):
+                if known.get(field) is not None:
+                    player[field] = known[field]
+        if not player['position']:
+            continue
+        if player['market_value'] is None:
+            player['market_value'] = 0
+            player['market_value_display'] = 'Unknown'
+        players.append(player)
+    return fetched._replace(players=players)
+
+def fetch_players(progress=None):
+    """Fetch players from PLAYER_SOURCE
 
-def fetch_players():
-    """Fetch players using static data"""
-    print("Fetching Premier League players from static data...")
+    `progress(stage)` is called as each step of the refresh begins.
+    """
+    global fetch_stats
     
-    players_data = get_premier_league_players()
+    if progress:
+        progress('fetching')
+    if PLAYER_SOURCE == 'football-data':
+        print("Fetching Premier League squads from football-data.org...")
+        with read_db() as db:
+            # Only squads stored from the API can be left as they are
+            known_teams = {row['team'] for row in db.execute(
+                "SELECT DISTINCT team FROM players WHERE player_key LIKE 'id:%'")}
+        fetched = fetch_api_players(known_teams)
+        players_data = fetched.players
+        if not players_data and not fetched.skipped_teams:
+            raise ValueError("football-data.org returned no usable players; keeping the current roster")
+        # A team that came back with no usable players keeps its rows rather than losing them all
+        fetched_teams = {player['team'] for player in players_data}
+        empty_teams = [team for team in fetched.teams
+                       if team not in fetched_teams and team not in fetched.skipped_teams]
+        fetch_stats = dict(fetched.stats, skipped_teams=fetched.skipped_teams, empty_teams=empty_teams)
+        if fetched.skipped_teams:
+            print(f"Unchanged upstream, skipped: {', '.join(fetched.skipped_teams)}")
+        if empty_teams:
+            print(f"No usable players returned, kept as they were: {', '.join(empty_teams)}")
+        changes = save_players_to_db(players_data, progress,
+                                     keep_teams=set(fetched.skipped_teams) | set(empty_teams))
+        # Only once their rows are committed may later refreshes skip these squads
+        if fetched.cache:
+            fetched.cache.put_all(fetched.responses)
+    else:
+        print("Fetching Premier League players from static data...")
+        players_data = get_premier_league_players()
+        fetch_stats = None
+        changes = save_players_to_db(players_data, progress)
     
-    # Save to database
-    save_players_to_db(players_data)
-    print(f"Successfully fetched and saved {len(players_data)} players")
+    print(f"Successfully fetched {len(players_data)} players: {len(changes.inserted)} added, "
+          f"{len(changes.updated)} updated, {len(changes.deleted)} removed, {changes.unchanged} unchanged")
     
     # Debug: Show some of the players we found
     if players_data:
@@ -2908,36 +452,44 @@ def fetch_players():
         for i, player in enumerate(players_data[:5]):
             print(f"  {i+1}. {player['name']} ({player['team']}) - {player['appearances']} apps")
     
-    return players_data
+    return changes
+
+# Request and cache counters from the last football-data.org refresh
+fetch_stats = None
+
+# Specific positions mapped to their position groups
+POSITION_MAPPINGS = {
+    # Forwards
+    'right wing': 'Right Wing',
+    'left wing': 'Left Wing',
+    'centre-forward': 'Striker',
+    'striker': 'Striker',
+    # Midfielders
+    'attacking midfield': 'Central Mid',
+    'central midfield': 'Central Mid',
+    'defensive midfield': 'Central Mid',
+    'right midfield': 'Right Mid',
+    'left midfield': 'Left Mid',
+    # Defenders
+    'centre-back': 'Centre-Back',
+    'right-back': 'Right-Back',
+    'left-back': 'Left-Back',
+    'sweeper': 'Centre-Back',
+    # Goalkeepers
+    'goalkeeper': 'Goalkeeper'
+}
+
+# Interned positions as (position -> id, size, row-major similarity table).
+# Ids are append-only, so an id stays valid in every later table.
+position_table = ({}, 0, bytearray())
+position_lock = threading.Lock()
 
 def get_position_group(position):
     """Convert specific position to position group"""
     position = position.lower()
     
-    # Dictionary mapping specific positions to their groups
-    position_mappings = {
-        # Forwards
-        'right wing': 'Right Wing',
-        'left wing': 'Left Wing',
-        'centre-forward': 'Striker',
-        'striker': 'Striker',
-        # Midfielders
-        'attacking midfield': 'Central Mid',
-        'central midfield': 'Central Mid',
-        'defensive midfield': 'Central Mid',
-        'right midfield': 'Right Mid',
-        'left midfield': 'Left Mid',
-        # Defenders
-        'centre-back': 'Centre-Back',
-        'right-back': 'Right-Back',
-        'left-back': 'Left-Back',
-        'sweeper': 'Centre-Back',
-        # Goalkeepers
-        'goalkeeper': 'Goalkeeper'
-    }
-    
     # Try to find an exact match first
-    for pos, group in position_mappings.items():
+    for pos, group in POSITION_MAPPINGS.items():
         if pos in position:
             return group
     
@@ -2967,8 +519,12 @@ def get_position_group(position):
     else:
         return position.title()
 
-def are_positions_similar(pos1, pos2):
+def compute_positions_similar(pos1, pos2):
     """Determine if two positions are similar enough to warrant a yellow indicator"""
+    # A missing position is only ever like another missing one
+    if not pos1 or not pos2:
+        return not pos1 and not pos2
+    
     # Convert positions to lowercase for comparison
     pos1 = pos1.lower()
     pos2 = pos2.lower()
@@ -3006,141 +562,875 @@ def are_positions_similar(pos1, pos2):
     
     return False
 
+def intern_positions(positions):
+    """Give each new position an id and rebuild the similarity table"""
+    global position_table
+    
+    with position_lock:
+        ids, _, _ = position_table
+        names = list(ids)
+        for position in positions:
+            if position not in ids and position not in names:
+                names.append(position)
+        if len(names) == len(ids):
+            return position_table
+        
+        size = len(names)
+        table = bytearray(size * size)
+        for i, pos1 in enumerate(names):
+            for j, pos2 in enumerate(names):
+                table[i * size + j] = compute_positions_similar(pos1, pos2)
+        
+        position_table = ({name: i for i, name in enumerate(names)}, size, table)
+        return position_table
+
+def position_id(position):
+    """Get the interned id of a position, interning it if it is new"""
+    interned = position_table[0].get(position)
+    if interned is None:
+        interned = intern_positions([position])[0][position]
+    return interned
+
+def positions_similar_by_id(id1, id2):
+    """Look up whether two interned positions are similar"""
+    _, size, table = position_table
+    return bool(table[id1 * size + id2])
+
+def are_positions_similar(pos1, pos2):
+    """Determine if two positions are similar enough to warrant a yellow indicator"""
+    id1 = position_id(pos1)
+    id2 = position_id(pos2)
+    return positions_similar_by_id(id1, id2)
+
 def load_players():
-    """Load players from database"""
-    with closing(get_db()) as db:
-        players = db.execute('SELECT * FROM players').fetchall()
-        return [dict(player) for player in players]
+    """Load players from the roster store"""
+    return [player.to_dict() for player in get_roster_store()]
+
+def load_roster_store():
+    """Reload the in-memory roster store from the players table"""
+    global roster_store
+    
+    with read_db() as db:
+        try:
+            players = db.execute('SELECT * FROM players ORDER BY id').fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"Error loading roster store: {e}")
+            players = []
+    
+    # Readers hold on to whichever store they fetched, so swapping is enough
+    roster_store = RosterStore(players)
+    return roster_store
+
+def get_roster_store():
+    """Get the roster store, loading it on first use"""
+    return roster_store if roster_store is not None else load_roster_store()
+
+def get_daily_puzzle():
+    """Get today's puzzle, computed at most once per puzzle date and roster generation
+
+    Besides the answer, the puzzle holds the serialized feedback for every
+    possible guess, indexed by player id.
+    """
+    global daily_puzzle
+    
+    today = puzzle_rollover.day().isoformat()
+    generation = roster_generation
+    puzzle = daily_puzzle
+    if puzzle is not None and puzzle.date == today and puzzle.generation == generation:
+        return puzzle
+    
+    # Just past the rollover: flip to the prepared puzzle without waiting on anyone
+    puzzle = next_puzzle
+    if puzzle is not None and puzzle.date == today and puzzle.generation == generation:
+        daily_puzzle = puzzle
+        return puzzle
+    
+    with daily_puzzle_lock:
+        # Another request may have built it while we waited, or the roster moved on
+        generation = roster_generation
+        puzzle = daily_puzzle
+        if puzzle is None or puzzle.date != today or puzzle.generation != generation:
+            puzzle = daily_puzzle = build_daily_puzzle(today, generation, select_daily_player(today))
+        return puzzle
+
+def build_daily_puzzle(today, generation, player):
+    """Precompute the feedback for every roster player against the day's answer"""
+    if not player:
+        return DailyPuzzle(today, generation, None, ())
+    
+    # Shared between requests, so hand out a read-only view
+    player = MappingProxyType(player)
+    store = get_roster_store()
+    feedback = [None] * (store.max_id + 1)
+    for guessed_player in store:
+        feedback[guessed_player['id']] = json_bytes(build_feedback(guessed_player, player))
+    
+    return DailyPuzzle(today, generation, player, tuple(feedback))
+
+def prepare_next_puzzle(day):
+    """Build the puzzle for an upcoming day unless it is already prepared"""
+    global next_puzzle
+    
+    day = day.isoformat()
+    generation = roster_generation
+    puzzle = next_puzzle
+    if puzzle is None or puzzle.date != day or puzzle.generation != generation:
+        next_puzzle = build_daily_puzzle(day, generation, select_daily_player(day))
+        print(f"Prepared the puzzle for {day}")
+
+# Builds tomorrow's puzzle in the background before the day changes; the
+# first request after the rollover finds it ready
+puzzle_rollover = DayRollover(
+    prepare=prepare_next_puzzle,
+    activate=lambda day: get_daily_puzzle(),
+    tz=PUZZLE_TIMEZONE,
+    offset=PUZZLE_ROLLOVER,
+    prewarm=PUZZLE_PREWARM_SECONDS
+)
 
 def get_daily_player():
-    """Get the daily player using date as seed"""
-    with closing(get_db()) as db:
-        # For testing, let's get a specific player (Erling Haaland)
-        player = db.execute('''
-            SELECT * FROM players 
-            WHERE name LIKE '%Haaland%' 
-            LIMIT 1
-        ''').fetchone()
+    """Get the daily player"""
+    return get_daily_puzzle().player
+
+def select_daily_player(today):
+    """Look up the daily player for a date in the puzzle schedule"""
+    player = None
+    if TEST_DAILY_PLAYER:
+        player = get_roster_store().find_name(TEST_DAILY_PLAYER)
+    
+    if not player:
+        with read_db() as db:
+            player = find_scheduled_player(db, today)
+    
+    # Dates past the end of the schedule get planned on demand
+    if not player and extend_puzzle_schedule(date.fromisoformat(today)):
+        with read_db() as db:
+            player = find_scheduled_player(db, today)
+    
+    return player.to_dict() if player else None
+
+def find_scheduled_player(db, day):
+    """Get the scheduled player for a date (YYYY-MM-DD)"""
+    scheduled = db.execute('SELECT player_id FROM daily_puzzles WHERE date = ?', [day]).fetchone()
+    return get_roster_store().get(scheduled['player_id']) if scheduled else None
+
+def schedule_candidates(db):
+    """Map each distinct player name to the id the schedule should use"""
+    candidates = {}
+    for player in db.execute('''
+        SELECT id, name FROM players
+        ORDER BY CASE WHEN team != 'Unknown' THEN 1 ELSE 2 END, id
+    '''):
+        candidates.setdefault(player['name'], player['id'])
+    return candidates
+
+def extend_puzzle_schedule(start=None, days=PUZZLE_SCHEDULE_DAYS):
+    """Plan answers from `start` (default today) until `days` days ahead
+
+    Dates already scheduled are kept. New dates draw from a shuffle bag
+    seeded by PUZZLE_SEED and the first new date, so the same roster
+    always produces the same calendar, and a player is not repeated
+    within PUZZLE_NO_REPEAT_DAYS (or the roster size, if smaller).
+    Returns the number of dates added.
+    """
+    start = start or puzzle_rollover.day()
+    end = start + timedelta(days=days)
+    
+    with write_db() as db:
+        candidates = schedule_candidates(db)
+        if not candidates:
+            return 0
         
-        # If we can't find the test player, fall back to random
-        if not player:
-            players = db.execute('SELECT * FROM players').fetchall()
-            if not players:
-                return None
-            
-            today = datetime.now().strftime('%Y-%m-%d')
-            random.seed(today)
-            player = random.choice(players)
+        last = db.execute('SELECT MAX(date) AS date FROM daily_puzzles').fetchone()['date']
+        day = max(start, date.fromisoformat(last) + timedelta(days=1)) if last else start
+        if day >= end:
+            return 0
         
-        return dict(player) if player else None
-
-def save_players_to_db(players_data):
-    """Save players to database"""
-    with get_db() as db:
-        # Clear existing players
-        db.execute('DELETE FROM players')
+        # Names used in the no-repeat window before the first new date
+        window = min(PUZZLE_NO_REPEAT_DAYS, len(candidates) - 1)
+        recent = deque((row['player_name'] for row in db.execute('''
+            SELECT player_name FROM daily_puzzles
+            WHERE date < ? ORDER BY date DESC LIMIT ?
+        ''', [day.isoformat(), window])), maxlen=window)
+        recent.reverse()
+        
+        rng = random.Random(f'{PUZZLE_SEED}:{day.isoformat()}')
+        names = sorted(candidates)
+        bag = []
+        schedule = []
+        while day < end:
+            if not bag:
+                bag = names[:]
+                rng.shuffle(bag)
+            name = bag.pop()
+            if name in recent:
+                continue
+            recent.append(name)
+            schedule.append((day.isoformat(), candidates[name], name))
+            day += timedelta(days=1)
         
-        # Insert new players
         db.executemany('''
-            INSERT INTO players 
-            (name, position, nationality, age, team, league, appearances, starts, market_value, market_value_display, last_updated)
-            VALUES 
-            (:name, :position, :nationality, :age, :team, :league, :appearances, :starts, :market_value, :market_value_display, :last_updated)
-        ''', [dict(p, 
-                   league='Premier League',
-                   last_updated=datetime.now().strftime('%Y-%m-%d')) for p in players_data])
+            INSERT INTO daily_puzzles (date, player_id, player_name) VALUES (?, ?, ?)
+        ''', schedule)
+        db.commit()
+    
+    return len(schedule)
+
+def remap_puzzle_schedule(today=None):
+    """Point the schedule at the current roster after a refresh
+
+    Player ids survive refreshes, so a date whose player is still on the
+    roster keeps them, picking up a new name if they were renamed. Only
+    dates whose id is gone are matched by name, for rosters keyed in a way
+    that changed. Past dates are never given a different player; upcoming
+    dates whose player left the roster get a replacement that is not
+    already scheduled nearby.
+    """
+    today = (today or puzzle_rollover.day()).isoformat()
+    
+    with write_db() as db:
+        candidates = schedule_candidates(db)
+        names = {row['id']: row['name'] for row in db.execute('SELECT id, name FROM players')}
+        scheduled = db.execute('SELECT date, player_id, player_name FROM daily_puzzles').fetchall()
         
+        updates = []
+        renames = []
+        replacements = []
+        used = set()
+        for row in scheduled:
+            name = names.get(row['player_id'])
+            if name is not None:
+                if name != row['player_name']:
+                    renames.append((name, row['date']))
+            else:
+                name = row['player_name']
+                player_id = candidates.get(name)
+                if player_id is not None:
+                    updates.append((player_id, row['date']))
+                elif row['date'] >= today:
+                    replacements.append(row['date'])
+                    continue
+            if row['date'] >= today:
+                used.add(name)
+        
+        if replacements and candidates:
+            unused = sorted(set(candidates) - used) or sorted(candidates)
+            for day in replacements:
+                rng = random.Random(f'{PUZZLE_SEED}:{day}:replacement')
+                name = unused.pop(rng.randrange(len(unused))) if len(unused) > 1 else unused[0]
+                db.execute('''
+                    UPDATE daily_puzzles SET player_id = ?, player_name = ? WHERE date = ?
+                ''', [candidates[name], name, day])
+        
+        db.executemany('UPDATE daily_puzzles SET player_id = ? WHERE date = ?', updates)
+        db.executemany('UPDATE daily_puzzles SET player_name = ? WHERE date = ?', renames)
         db.commit()
+    
+    return len(updates) + len(renames), len(replacements)
+
+def player_key(player):
+    """Natural key that identifies a player across roster refreshes"""
+    if player.get('external_id'):
+        return f"id:{player['external_id']}"
+    return f"{normalize_search_key(player['name'])}|{normalize_search_key(player.get('nationality') or '')}"
+
+def save_players_to_db(players_data, progress=None, keep_teams=()):
+    """Save players to database
+
+    Incoming players are matched to stored rows on player_key and only the
+    differences are written, in one transaction, so a player keeps its id
+    across refreshes and readers never see a half-written roster. Stored
+    players of `keep_teams` that aren't in `players_data` are left alone
+    rather than deleted. Returns a RosterChanges summary.
+    """
+    if progress:
+        progress('saving')
+    today = datetime.now().strftime('%Y-%m-%d')
+    incoming = {}
+    for p in players_data:
+        search_key = normalize_search_key(p['name'])
+        player = {field: p.get(field) for field in PLAYER_FIELDS}
+        player.update(league='Premier League',
+                      search_key=search_key,
+                      phonetic_keys=' '.join(phonetic_keys(search_key)))
+        # The seed roster lists some players twice; the last entry wins
+        incoming[player_key(p)] = player
+    
+    with write_db() as db:
+        current = {row['player_key']: row for row in db.execute(
+            f"SELECT id, player_key, {', '.join(PLAYER_FIELDS)} FROM players")}
+        
+        inserts = []
+        updates = []
+        fields = set()
+        for key, player in incoming.items():
+            row = current.pop(key, None)
+            if row is None:
+                inserts.append(dict(player, player_key=key, last_updated=today))
+                continue
+            changed = {field for field in PLAYER_FIELDS if row[field] != player[field]}
+            if changed:
+                fields |= changed
+                updates.append(dict(player, id=row['id'], last_updated=today))
+        kept = [row for row in current.values() if row['team'] in keep_teams]
+        deleted = [row['id'] for row in current.values() if row['team'] not in keep_teams]
+        
+        db.executemany('DELETE FROM players WHERE id = ?', [(player_id,) for player_id in deleted])
+        db.executemany(f"""
+            UPDATE players SET {', '.join(f'{field} = :{field}' for field in PLAYER_FIELDS)}, last_updated = :last_updated
+            WHERE id = :id
+        """, updates)
+        inserted = [db.execute(f"""
+            INSERT INTO players (player_key, {', '.join(PLAYER_FIELDS)}, last_updated)
+            VALUES (:player_key, {', '.join(f':{field}' for field in PLAYER_FIELDS)}, :last_updated)
+        """, player).lastrowid for player in inserts]
+        
+        db.execute("INSERT OR REPLACE INTO roster_meta (key, value) VALUES ('last_refresh', ?)", [today])
+    
+    changes = RosterChanges(
+        inserted=inserted,
+        updated=[player['id'] for player in updates],
+        deleted=deleted,
+        unchanged=len(incoming) - len(inserts) - len(updates) + len(kept),
+        fields=frozenset(fields)
+    )
+    if progress:
+        progress('reloading')
+    apply_roster_changes(changes, incoming.values())
+    return changes
+
+def apply_roster_changes(changes, players):
+    """Refresh what depends on the roster, as far as the changes require"""
+    global daily_puzzle, next_puzzle
+    
+    if not (changes.inserted or changes.updated or changes.deleted):
+        return
+    
+    intern_positions(p['position'] for p in players if p['position'])
+    # Updates keep ids, so only inserts, deletes and renames affect the schedule
+    if changes.inserted or changes.deleted or 'name' in changes.fields:
+        remap_puzzle_schedule()
+        extend_puzzle_schedule()
+    # Swap the store and index in before bumping so the new generation never sees old rows
+    load_roster_store()
+    
+    if not (changes.inserted or changes.deleted) and changes.fields <= HIDDEN_PLAYER_FIELDS:
+        # Nothing any response shows has changed, so every cache stays valid
+        return
+    
+    rebuild_search_index()
+    with daily_puzzle_lock:
+        generation = roster_generation + 1
+        # Carry the prepared puzzles over, recomputing only the changed players
+        daily_puzzle = patch_daily_puzzle(daily_puzzle, changes, generation) or daily_puzzle
+        next_puzzle = patch_daily_puzzle(next_puzzle, changes, generation) or next_puzzle
+        bump_roster_generation()
+
+def patch_daily_puzzle(puzzle, changes, generation):
+    """Move a puzzle to a new roster generation by recomputing only the changed players' feedback
+
+    Returns None if the puzzle has to be rebuilt instead, i.e. its answer
+    changed or is no longer the scheduled one.
+    """
+    if puzzle is None or puzzle.player is None:
+        return None
+    answer_id = puzzle.player['id']
+    if answer_id in changes.updated or answer_id in changes.deleted:
+        return None
+    if select_daily_player(puzzle.date) != dict(puzzle.player):
+        return None
+    
+    store = get_roster_store()
+    feedback = list(puzzle.feedback[:store.max_id + 1])
+    feedback.extend([None] * (store.max_id + 1 - len(feedback)))
+    for player_id in changes.deleted:
+        if player_id < len(feedback):
+            feedback[player_id] = None
+    for player_id in changes.inserted + changes.updated:
+        feedback[player_id] = json_bytes(build_feedback(store.get(player_id), puzzle.player))
+    return puzzle._replace(generation=generation, feedback=tuple(feedback))
+
+def bump_roster_generation():
+    """Invalidate everything cached against the previous roster"""
+    global roster_generation
+    roster_generation += 1
+    return roster_generation
+
+def rebuild_search_index():
+    """Rebuild the in-memory search index from the roster store"""
+    global search_index
+    
+    with read_db() as db:
+        aliases = load_aliases(db)
+    
+    players = [dict(player, nation=player['nationality'],
+                    position_group=get_position_group(player['position'] or ''))
+               for player in get_roster_store()]
+    
+    # Swap in a fully built index so concurrent searches never see a partial one
+    search_index = PlayerSearchIndex(players, aliases)
+    return search_index
+
+def load_aliases(db):
+    """Load (alias_key, player_name) pairs from the alias table"""
+    try:
+        return db.execute('SELECT alias_key, player_name FROM player_aliases').fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+def import_aliases(path=ALIASES_FILE):
+    """Bulk-load player nicknames from a CSV file with alias and player columns"""
+    if not os.path.exists(path):
+        return 0
+    
+    with open(path, newline='', encoding='utf-8') as f:
+        aliases = [{
+            'alias': row['alias'].strip(),
+            'alias_key': normalize_search_key(row['alias']),
+            'player_name': row['player'].strip()
+        } for row in csv.DictReader(f) if row.get('alias') and row.get('player')]
+    
+    with write_db() as db:
+        db.executemany('''
+            INSERT OR REPLACE INTO player_aliases (alias, alias_key, player_name)
+            VALUES (:alias, :alias_key, :player_name)
+        ''', aliases)
+        db.commit()
+        
+        # Only the alias map changes, the name postings are left alone
+        if search_index is not None:
+            search_index.set_aliases(load_aliases(db))
+    
+    # New aliases change search results for the same roster
+    bump_roster_generation()
+    
+    print(f"Loaded {len(aliases)} player aliases from {path}")
+    return len(aliases)
+
+def get_search_index():
+    """Get the search index, building it on first use"""
+    return search_index if search_index is not None else rebuild_search_index()
 
 @app.route('/')
 def home():
-    return render_template('index.html')
+    return render_template('index.html', roster_version=get_roster_index()['etag'])
+
+def get_roster_index():
+    """Get the serialized roster index, rebuilding it when the roster or aliases change"""
+    global roster_index_cache
+    
+    index = get_search_index()
+    cached = roster_index_cache
+    if cached is None or cached['index'] is not index or cached['aliases'] is not index.aliases:
+        aliases = index.aliases
+        body = json.dumps(index.compact(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        cached = roster_index_cache = {
+            'index': index,
+            'aliases': aliases,
+            'body': body,
+            'gzip': gzip.compress(body, mtime=0),
+            'etag': hashlib.sha256(body).hexdigest()[:20]
+        }
+    return cached
+
+@app.route('/api/players/index')
+def players_index():
+    """Whole roster in columnar form so the page can run autocomplete locally"""
+    roster_index = get_roster_index()
+    
+    if roster_index['etag'] in request.if_none_match:
+        response = app.response_class(status=304)
+    elif 'gzip' in request.accept_encodings:
+        response = app.response_class(roster_index['gzip'], mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(roster_index['body'], mimetype='application/json')
+    
+    response.set_etag(roster_index['etag'])
+    response.vary.add('Accept-Encoding')
+    # The page requests ?v=<etag>, so a versioned URL never changes content
+    if request.args.get('v') == roster_index['etag']:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'public, max-age=3600, must-revalidate'
+    return response
+
+def search_players_like(db, query, limit=10):
+    """Search players by their precomputed search keys
+
+    The exact and prefix tiers are range scans on idx_players_search_key;
+    only the substring tier still has to look at every row.
+    """
+    # Upper bound for "starts with query" as a range: no key character sorts after it
+    params = {'q': query, 'q_end': query + '\U0010ffff', 'contains': f'%{query}%'}
+    players = db.execute('''
+        SELECT * FROM (
+            SELECT id, name, team, league, position, age, nationality as nation, market_value_display, 1 AS tier
+            FROM players WHERE search_key = :q
+            UNION ALL
+            SELECT id, name, team, league, position, age, nationality as nation, market_value_display, 2 AS tier
+            FROM players WHERE search_key > :q AND search_key < :q_end
+            UNION ALL
+            SELECT id, name, team, league, position, age, nationality as nation, market_value_display, 3 AS tier
+            FROM players WHERE search_key LIKE :contains AND NOT (search_key >= :q AND search_key < :q_end)
+        )
+        ORDER BY 
+            tier,
+            CASE WHEN team != 'Unknown' THEN 1 ELSE 2 END,
+            name
+    ''', params).fetchall()
+    
+    return format_search_results(players, limit)
+
+def search_players_fts(db, query, limit=10):
+    """Search players through the FTS5 index with prefix tokens and bm25 ranking"""
+    tokens = re.findall(r'\w+', query)
+    if not tokens:
+        return None
+    
+    # Every token must prefix-match a word in name, team or nationality
+    match = ' '.join('"' + token + '"*' for token in tokens)
+    players = db.execute('''
+        SELECT p.id, p.name, p.team, p.league, p.position, p.age, p.nationality as nation, p.market_value_display
+        FROM players_fts
+        JOIN players p ON p.id = players_fts.rowid
+        WHERE players_fts MATCH ?
+        ORDER BY 
+            bm25(players_fts, ?, ?, ?),
+            CASE WHEN p.team != 'Unknown' THEN 1 ELSE 2 END,
+            p.name
+        LIMIT ?
+    ''', [match, *FTS_COLUMN_WEIGHTS, limit * 3]).fetchall()
+    
+    return format_search_results(players, limit)
+
+def format_search_results(players, limit=10):
+    """Convert ranked player rows into autocomplete results"""
+    # Filter out duplicates, preferring entries with known teams
+    seen_players = {}
+    for player in players:
+        name = player['name']
+        if name not in seen_players:
+            seen_players[name] = player
+        elif player['team'] != 'Unknown' and seen_players[name]['team'] == 'Unknown':
+            # Replace the Unknown team version with the known team version
+            seen_players[name] = player
+    
+    return [{
+        'id': player['id'],
+        'name': player['name'],
+        'team': player['team'],
+        'league': player['league'],
+        'position': player['position'],
+        'age': player['age'],
+        'nation': player['nation'],
+        'market_value_display': player['market_value_display'],
+        'label': f"{player['name']} ({player['team']})"
+    } for player in list(seen_players.values())[:limit]]
 
 @app.route('/api/players/search')
 def search_players():
-    """Search players by name (for autocomplete)"""
-    query = request.args.get('q', '').lower()
-    
-    with closing(get_db()) as db:
-        # First get all matching players
-        players = db.execute('''
-            SELECT DISTINCT id, name, team, league, position, age, nationality as nation, market_value_display 
-            FROM players 
-            WHERE LOWER(name) LIKE ?
-            ORDER BY 
-                CASE WHEN LOWER(name) = ? THEN 1
-                     WHEN LOWER(name) LIKE ? THEN 2
-                     ELSE 3 END,
-                CASE WHEN team != 'Unknown' THEN 1 ELSE 2 END,
-                name
-        ''', [f'%{query}%', query, f'{query}%']).fetchall()
-        
-        # Filter out duplicates, preferring entries with known teams
-        seen_players = {}
-        filtered_players = []
-        for player in players:
-            name = player['name']
-            if name not in seen_players:
-                seen_players[name] = player
-            elif player['team'] != 'Unknown' and seen_players[name]['team'] == 'Unknown':
-                # Replace the Unknown team version with the known team version
-                seen_players[name] = player
-        
-        filtered_players = list(seen_players.values())[:10]  # Limit to 10 results
-        
-        return jsonify([{
-            'id': player['id'],
-            'name': player['name'],
-            'team': player['team'],
-            'league': player['league'],
-            'position': player['position'],
-            'age': player['age'],
-            'nation': player['nation'],
-            'market_value_display': player['market_value_display'],
-            'label': f"{player['name']} ({player['team']}" + (")" if player['team'] != "Unknown" else ")")
-        } for player in filtered_players])
+    """Search players by name (for autocomplete)
+
+    mode=like runs the original SQL scan and mode=fts queries the FTS5
+    index, which every worker process shares through the database.
+    Optional filters (team, league, nationality and position_group, each
+    repeatable, plus min_age/max_age and min_value/max_value) are answered
+    from the in-memory index's bitmaps.
+    Responses are cached as serialized JSON for the current roster.
+    """
+    query = normalize_search_key(request.args.get('q', ''))
+    mode = request.args.get('mode')
+    if mode not in ('like', 'fts'):
+        mode = None
+    
+    try:
+        filters = parse_search_filters(request.args)
+    except ValueError:
+        return jsonify({"error": "Age and value filters must be whole numbers"}), 400
+    if filters:
+        mode = None
+    
+    key = (roster_generation, mode, query, filters)
+    body = search_cache.get(key)
+    if body is None:
+        body = search_flight.do(key, lambda: cache_search(key, query, mode, filters))
+    
+    return app.response_class(body, mimetype='application/json')
+
+def parse_search_filters(args):
+    """Read facet and range filters from the query string into a hashable tuple"""
+    filters = []
+    for facet in PlayerSearchIndex.FACETS:
+        values = tuple(sorted({value for value in args.getlist(facet) if value}))
+        if values:
+            filters.append((facet, values))
+    for bound in ('min_age', 'max_age', 'min_value', 'max_value'):
+        value = args.get(bound)
+        if value:
+            filters.append((bound, int(value)))
+    return tuple(filters)
+
+def cache_search(key, query, mode, filters=()):
+    """Run a search and store its serialized response in the search cache"""
+    body = json_bytes(run_search(query, mode, filters))
+    search_cache.set(key, body)
+    return body
+
+def json_bytes(data):
+    """Serialize a response body once so it can be shared and cached"""
+    return app.json.dumps(data).encode('utf-8')
+
+def run_search(query, mode=None, filters=()):
+    """Run a normalized search query through the selected search path"""
+    if mode == 'like':
+        with read_db() as db:
+            return search_players_like(db, query)
+    
+    if mode == 'fts':
+        with read_db() as db:
+            results = search_players_fts(db, query) if has_fts(db) else None
+        if results is not None:
+            return results
+    
+    index = get_search_index()
+    bitmap = None
+    if filters:
+        options = dict(filters)
+        bitmap = index.filter_bitmap(
+            {facet: options.get(facet) for facet in PlayerSearchIndex.FACETS},
+            age=(options.get('min_age'), options.get('max_age')),
+            market_value=(options.get('min_value'), options.get('max_value'))
+        )
+    return index.search(query, limit=10, bitmap=bitmap)
+
+@app.route('/api/players/search/cache')
+def search_cache_stats():
+    """Hit, miss and eviction counters for the search response cache"""
+    return jsonify(dict(search_cache.stats(),
+                        generation=roster_generation,
+                        single_flight=search_flight.stats()))
 
 @app.route('/api/guess', methods=['POST'])
 def check_guess():
     data = request.get_json()
     guessed_player_id = data.get('guess', {}).get('id')
     
-    with closing(get_db()) as db:
-        guessed_player = db.execute('SELECT * FROM players WHERE id = ?', [guessed_player_id]).fetchone()
-        if not guessed_player:
-            return jsonify({"error": "Player not found"}), 404
-            
-        daily_player = get_daily_player()
-        if not daily_player:
-            return jsonify({"error": "No players in database"}), 500
-        
-        guessed_player = dict(guessed_player)
-        
-        feedback = {
-            'nation': guessed_player['nationality'] == daily_player['nationality'],
-            'league': guessed_player['league'] == daily_player['league'],
-            'team': guessed_player['team'] == daily_player['team'],
-            'position': {
-                'exact': guessed_player['position'] == daily_player['position'],
-                'similar': are_positions_similar(guessed_player['position'], daily_player['position'])
-            },
-            'age': {
-                'correct': guessed_player['age'] == daily_player['age'],
-                'close': abs(guessed_player['age'] - daily_player['age']) <= 2,
-                'higher': guessed_player['age'] < daily_player['age'],
-                'lower': guessed_player['age'] > daily_player['age']
-            },
-            'market_value': {
-                'correct': guessed_player['market_value'] == daily_player['market_value'],
-                'close': abs(guessed_player['market_value'] - daily_player['market_value']) <= 10000000,  # Within 10M
-                'higher': guessed_player['market_value'] < daily_player['market_value'],
-                'lower': guessed_player['market_value'] > daily_player['market_value'],
-                'display': daily_player['market_value_display']
-            },
-            'correct': guessed_player['id'] == daily_player['id']
-        }
+    puzzle = get_daily_puzzle()
+    if puzzle.player is not None:
+        body, status = lookup_feedback(puzzle, guessed_player_id)
+        if status == 200:
+            record_guess(puzzle, guessed_player_id, data)
+    else:
+        # Nothing precomputed without an answer; the live path reports why
+        key = (roster_generation, puzzle.date, str(guessed_player_id))
+        body, status = guess_flight.do(key, lambda: evaluate_guess(guessed_player_id))
+    return app.response_class(body, status=status, mimetype='application/json')
+
+def record_guess(puzzle, guessed_player_id, data):
+    """Queue a guess event; the client may tag it with a session id and guess number"""
+    session_id = data.get('session')
+    if not isinstance(session_id, str) or len(session_id) > 64:
+        session_id = None
+    guess_number = data.get('guess_number')
+    if not isinstance(guess_number, int) or isinstance(guess_number, bool) or not 0 < guess_number < 1000:
+        guess_number = None
+    
+    guessed_player_id = int(guessed_player_id)
+    guess_log.append((puzzle.date, session_id, guess_number, guessed_player_id,
+                      int(guessed_player_id == puzzle.player['id']), time.time()))
+
+def write_guess_events(events):
+    """Insert a batch of queued guess events in one transaction and roll them into the stats"""
+    global stats_checkpointed_at
+    
+    # Load each day's stats before its new events land, so they are not replayed twice
+    for day in {event[0] for event in events}:
+        daily_stats.get(day)
+    
+    with write_db() as db:
+        db.executemany('''
+            INSERT INTO guess_events (date, session_id, guess_number, player_id, correct, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', events)
+    daily_stats.add_events(events)
+    
+    if time.monotonic() - stats_checkpointed_at >= STATS_CHECKPOINT_INTERVAL:
+        checkpoint_daily_stats()
+
+def checkpoint_daily_stats():
+    """Bring the checkpoint of every day that changed since the last call up to date
+
+    A checkpoint is advanced from the shared guess_events log rather than
+    overwritten with this process's counts, so with several worker
+    processes each one's events land exactly once. The write lock is taken
+    before the checkpoint is read, so two workers can't advance it from the
+    same starting point. The rebuilt day then replaces the in-memory one,
+    which picks up the other workers' events too.
+    """
+    global stats_checkpointed_at
+    
+    stats_checkpointed_at = time.monotonic()
+    days = daily_stats.take_dirty()
+    for day in days:
+        with write_db() as db:
+            db.execute('BEGIN IMMEDIATE')
+            stats = replay_day_stats(db, day)
+            db.execute('''
+                INSERT OR REPLACE INTO daily_stats
+                (date, started, solved, guesses, solve_guesses, histogram, wrong_guesses, sessions, last_event_id)
+                VALUES
+                (:date, :started, :solved, :guesses, :solve_guesses, :histogram, :wrong_guesses, :sessions,
+                 :last_event_id)
+            ''', stats.checkpoint_row())
+        daily_stats.replace(stats)
+    return len(days)
+
+def replay_day_stats(db, day):
+    """A day's stats from its checkpoint plus the events logged after it"""
+    row = db.execute('SELECT * FROM daily_stats WHERE date = ?', [day]).fetchone()
+    stats = DayStats.from_checkpoint(row, STATS_TOP_WRONG) if row else DayStats(day, STATS_TOP_WRONG)
+    for event in db.execute('''
+        SELECT id, session_id, guess_number, player_id, correct FROM guess_events
+        WHERE date = ? AND id > ? ORDER BY id
+    ''', [day, stats.last_event_id]):
+        stats.add(event['session_id'], event['guess_number'], event['player_id'], event['correct'])
+        stats.last_event_id = event['id']
+    return stats
+
+def load_day_stats(day):
+    """Restore a day's stats from its checkpoint plus the events logged after it"""
+    with read_db() as db:
+        try:
+            return replay_day_stats(db, day)
+        except sqlite3.OperationalError as e:
+            print(f"Error loading stats for {day}: {e}")
+            return None
+
+def close_guess_log():
+    """Drain the guess log and save the stats it produced"""
+    guess_log.close()
+    checkpoint_daily_stats()
+
+# Guesses are logged off the request path and drained when the process exits
+guess_log = GuessLog(write_guess_events, max_batch=GUESS_LOG_BATCH, flush_interval=GUESS_LOG_INTERVAL)
+atexit.register(close_guess_log)
+
+# Running per-day totals, updated by the guess log writer and checkpointed to daily_stats
+daily_stats = DailyStats(load_day_stats, top_size=STATS_TOP_WRONG)
+stats_checkpointed_at = time.monotonic()
+
+# Serialized /api/stats/today body as (date, stats version, roster generation, body)
+stats_response = None
+
+@app.route('/api/stats/today')
+def stats_today():
+    """Today's totals from the running stats; rebuilt only when they have changed"""
+    global stats_response
+    
+    today = puzzle_rollover.day().isoformat()
+    version, summary = daily_stats.summary(today)
+    cached = stats_response
+    if cached is None or cached[:3] != (today, version, roster_generation):
+        store = get_roster_store()
+        wrong_guesses = []
+        for player_id, count in summary['common_wrong_guesses']:
+            player = store.get(player_id)
+            wrong_guesses.append({
+                'id': player_id,
+                'name': player['name'] if player else None,
+                'count': count
+            })
+        summary['common_wrong_guesses'] = wrong_guesses
+        cached = stats_response = (today, version, roster_generation, json_bytes(summary))
+    return app.response_class(cached[3], mimetype='application/json')
+
+@app.route('/api/guess/batch', methods=['POST'])
+def check_guess_batch():
+    """Evaluate a list of guesses against the same daily puzzle in one request"""
+    data = request.get_json(silent=True) or {}
+    guesses = data.get('guesses')
+    if not isinstance(guesses, list) or len(guesses) > MAX_BATCH_GUESSES:
+        return jsonify({"error": f"guesses must be a list of at most {MAX_BATCH_GUESSES} player ids"}), 400
+    
+    # Restored sessions send plain ids; accept the {id} objects /api/guess takes as well
+    ids = []
+    for guess in guesses:
+        guessed_player_id = guess.get('id') if isinstance(guess, dict) else guess
+        if isinstance(guessed_player_id, str) and guessed_player_id.isdigit():
+            guessed_player_id = int(guessed_player_id)
+        if not isinstance(guessed_player_id, int) or isinstance(guessed_player_id, bool):
+            return jsonify({"error": "guesses must be a list of player ids"}), 400
+        if guessed_player_id not in ids:
+            ids.append(guessed_player_id)
+    
+    # Resolve the puzzle once so every result is judged against the same answer
+    puzzle = get_daily_puzzle()
+    results = []
+    for guessed_player_id in ids:
+        if puzzle.player is not None:
+            body, _ = lookup_feedback(puzzle, guessed_player_id)
+        else:
+            body, _ = evaluate_guess(guessed_player_id)
+        results.append(body)
+    
+    # The per-guess bodies are already serialized, so splice them in as-is
+    body = b''.join([
+        b'{"date":', json_bytes(puzzle.date),
+        b',"ids":', json_bytes(ids),
+        b',"results":[', b','.join(results), b']}'
+    ])
+    return app.response_class(body, mimetype='application/json')
+
+def lookup_feedback(puzzle, guessed_player_id):
+    """Get the precomputed feedback for a guessed player id and a status code"""
+    if isinstance(guessed_player_id, str) and guessed_player_id.isdigit():
+        guessed_player_id = int(guessed_player_id)
+    if isinstance(guessed_player_id, int) and 0 <= guessed_player_id < len(puzzle.feedback):
+        feedback = puzzle.feedback[guessed_player_id]
+        if feedback is not None:
+            return feedback, 200
+    return json_bytes({"error": "Player not found"}), 404
+
+def evaluate_guess(guessed_player_id):
+    """Compare a guess with the daily player, returning serialized feedback and a status code"""
+    if isinstance(guessed_player_id, str) and guessed_player_id.isdigit():
+        guessed_player_id = int(guessed_player_id)
+    guessed_player = get_roster_store().get(guessed_player_id)
+    if not guessed_player:
+        return json_bytes({"error": "Player not found"}), 404
         
-        return jsonify(feedback)
+    daily_player = get_daily_player()
+    if not daily_player:
+        return json_bytes({"error": "No players in database"}), 500
+    
+    return json_bytes(build_feedback(guessed_player, daily_player)), 200
+
+def build_feedback(guessed_player, daily_player):
+    """Compare a guessed player with the daily player attribute by attribute"""
+    return {
+        'nation': guessed_player['nationality'] == daily_player['nationality'],
+        'league': guessed_player['league'] == daily_player['league'],
+        'team': guessed_player['team'] == daily_player['team'],
+        'position': {
+            'exact': guessed_player['position'] == daily_player['position'],
+            'similar': are_positions_similar(guessed_player['position'], daily_player['position'])
+        },
+        'age': {
+            'correct': guessed_player['age'] == daily_player['age'],
+            'close': abs(guessed_player['age'] - daily_player['age']) <= 2,
+            'higher': guessed_player['age'] < daily_player['age'],
+            'lower': guessed_player['age'] > daily_player['age']
+        },
+        'market_value': {
+            'correct': guessed_player['market_value'] == daily_player['market_value'],
+            'close': abs(guessed_player['market_value'] - daily_player['market_value']) <= 10000000,  # Within 10M
+            'higher': guessed_player['market_value'] < daily_player['market_value'],
+            'lower': guessed_player['market_value'] > daily_player['market_value'],
+            'display': daily_player['market_value_display']
+        },
+        'correct': guessed_player['id'] == daily_player['id']
+    }
 
 @app.route('/api/update-players')
 def update_players():
@@ -3148,7 +1438,7 @@ def update_players():
     force_update = request.args.get('force', '').lower() == 'true'
     
     try:
-        with closing(get_db()) as db:
+        with read_db() as db:
             # Check if we have any players
             player_count = db.execute('SELECT COUNT(*) as count FROM players').fetchone()['count']
             
@@ -3156,10 +1446,10 @@ def update_players():
                 print("Database is empty, forcing update...")
                 force_update = True
             else:
-                # Check last update time
-                last_update = db.execute('SELECT last_updated FROM players LIMIT 1').fetchone()
+                # Check last refresh time; unchanged rows keep their own last_updated
+                last_update = db.execute("SELECT value FROM roster_meta WHERE key = 'last_refresh'").fetchone()
                 if last_update:
-                    last_update = datetime.strptime(last_update['last_updated'], '%Y-%m-%d')
+                    last_update = datetime.strptime(last_update['value'], '%Y-%m-%d')
                     days_since_update = (datetime.now() - last_update).days
                     
                     if not force_update and days_since_update < 7:
@@ -3171,15 +1461,49 @@ def update_players():
         print(f"Error checking database: {e}")
         force_update = True
     
-    players = fetch_players()
+    # The refresh runs in the background; callers arriving meanwhile share the same job
+    job, started = refresh_jobs.submit(run_refresh)
     return jsonify({
-        "message": f"Updated {len(players)} players",
-        "player_count": len(players)
-    })
+        "message": "Update started" if started else "Update already in progress",
+        "job_id": job.id,
+        "status_url": f"/api/update-players/{job.id}"
+    }), 202
+
+@app.route('/api/update-players/<job_id>')
+def update_players_status(job_id):
+    """Progress and timings of a roster refresh job"""
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+def run_refresh(job):
+    """Refresh the roster as a background job and summarize what changed"""
+    changes = fetch_players(progress=job.stage)
+    result = {
+        "player_count": len(get_roster_store()),
+        "changes": {
+            "inserted": len(changes.inserted),
+            "updated": len(changes.updated),
+            "deleted": len(changes.deleted),
+            "unchanged": changes.unchanged
+        }
+    }
+    if fetch_stats is not None:
+        # Requests, retries, cache hits, bytes saved and teams skipped upstream
+        result["fetch"] = fetch_stats
+    return result
+
+# Roster refreshes started from /api/update-players, one at a time
+refresh_jobs = JobRunner()
 
 if __name__ == '__main__':
     # Initialize database
     setup_database()
+    import_aliases()
+    load_roster_store()
+    rebuild_search_index()
+    puzzle_rollover.start()
     
     # Make sure the data directory exists
     os.makedirs('data', exist_ok=True)
@@ -0,0 +1,675 @@
+"""Benchmarks for the player search and guess paths
+
+Usage: python bench.py [search] [phonetic] [filters] [guess] [store] [db] [rollover] [guesslog] [stats] [startup] [refresh] [fetch] [conditional]
+"""
+import asyncio
+import contextlib
+import functools
+import hashlib
+import io
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import closing
+from datetime import date, datetime
+
+import app
+from guess_log import GuessLog
+from roster_store import RosterStore
+from search_index import PlayerSearchIndex
+
+SIZES = (1_000, 10_000, 100_000)
+QUERIES = ('s', 'sa', 'sal', 'salah', 'mar', 'martin od', 'son', 'zzz')
+
+SYLLABLES = ['ka', 'lo', 'mar', 'ti', 'ne', 'sa', 'lah', 'ro', 'dri', 'ben', 'wi', 'son',
+             'ha', 'land', 'ed', 'er', 'gar', 'da', 'vi', 'el', 'mo', 'an', 'to', 'ni']
+TEAMS = ['Arsenal', 'Chelsea', 'Liverpool', 'Manchester City', 'Tottenham', 'Everton',
+         'Brentford', 'Fulham', 'Wolves', 'Brighton', 'Unknown']
+NATIONS = ['England', 'France', 'Spain', 'Brazil', 'Norway', 'Egypt', 'Portugal', 'Germany']
+POSITIONS = ['Goalkeeper', 'Centre-Back', 'Left-Back', 'Right-Back', 'Defensive Midfield',
+             'Central Midfield', 'Attacking Midfield', 'Left Wing', 'Right Wing', 'Centre-Forward']
+
+
+def synthetic_players(count, seed=0):
+    """Generate a reproducible roster of `count` made-up players"""
+    rng = random.Random(seed)
+
+    def word():
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+
+    players = []
+    for _ in range(count):
+        value = rng.randint(1, 150) * 1_000_000
+        players.append({
+            'name': f"{word()} {word()}",
+            'position': rng.choice(POSITIONS),
+            'nationality': rng.choice(NATIONS),
+            'age': rng.randint(17, 38),
+            'team': rng.choice(TEAMS),
+            'league': 'Premier League',
+            'appearances': rng.randint(0, 38),
+            'starts': rng.randint(0, 38),
+            'market_value': value,
+            'market_value_display': f"€{value // 1_000_000}M",
+        })
+    return players
+
+
+def use_temp_database(players):
+    """Point the app at a fresh temporary database seeded with `players`"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    app.DATABASE = path
+    app.fts_enabled = None
+    app.setup_database()
+    app.save_players_to_db(players)
+    return path
+
+
+def timed(fn, repeat):
+    """Return per-call latency percentiles (p50, p99) in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def bench_search():
+    """Compare the LIKE scan, FTS5 and in-memory search paths"""
+    print(f"{'players':>8} {'mode':>6} {'query':>10} {'p50 us':>10} {'p99 us':>10}")
+    for size in SIZES:
+        path = use_temp_database(synthetic_players(size))
+        repeat = max(20, 200_000 // size)
+        try:
+            with app.read_db() as db:
+                modes = {
+                    'like': lambda q: app.search_players_like(db, q),
+                    'fts': lambda q: app.search_players_fts(db, q),
+                    'index': lambda q: app.get_search_index().search(q),
+                }
+                for mode, search in modes.items():
+                    for query in QUERIES:
+                        p50, p99 = timed(lambda: search(query), repeat)
+                        print(f"{size:>8} {mode:>6} {query:>10} {p50:>10.1f} {p99:>10.1f}")
+        finally:
+            os.remove(path)
+
+
+def bench_phonetic():
+    """Throughput of the phonetic tier as the roster grows"""
+    queries = ('kallo', 'marr tee', 'sahlah', 'wisson', 'edur', 'landt')
+    print(f"{'players':>8} {'query':>10} {'hits':>6} {'lookups/s':>12}")
+    for size in (250,) + SIZES:
+        rows = [dict(player, id=i, nation=player['nationality'], search_key=None, phonetic_keys=None,
+                     position_group=app.get_position_group(player['position']))
+                for i, player in enumerate(synthetic_players(size))]
+        index = PlayerSearchIndex(rows)
+        for query in queries:
+            # Same top-10 cut the search applies to every tier
+            def lookup():
+                return list(itertools.islice(index._phonetic_candidates(query), 10))
+
+            hits = len(lookup())
+            repeat = 50_000
+            start = time.perf_counter()
+            for _ in range(repeat):
+                lookup()
+            rate = repeat / (time.perf_counter() - start)
+            print(f"{size:>8} {query:>10} {hits:>6} {rate:>12,.0f}")
+
+
+def bench_filters():
+    """Filtered vs unfiltered index search as the roster grows"""
+    print(f"{'players':>8} {'query':>6} {'unfiltered us':>14} {'filtered us':>12} {'hits':>5}")
+    for size in (2_500, 20_000, 100_000):
+        rows = [dict(player, id=i, nation=player['nationality'], search_key=None, phonetic_keys=None,
+                     position_group=app.get_position_group(player['position']))
+                for i, player in enumerate(synthetic_players(size))]
+        index = PlayerSearchIndex(rows)
+        bitmap = index.filter_bitmap({'team': ['Arsenal'], 'nationality': ['England']}, age=(20, 30))
+        for query in ('a', 'sa', 'mar'):
+            unfiltered, _ = timed(lambda: index.search(query), 200)
+            filtered, _ = timed(lambda: index.search(query, bitmap=bitmap), 200)
+            hits = len(index.search(query, bitmap=bitmap))
+            print(f"{size:>8} {query:>6} {unfiltered:>14.1f} {filtered:>12.1f} {hits:>5}")
+
+
+def bench_guess():
+    """Guesses per second for the live comparison and the precomputed table"""
+    print(f"{'players':>8} {'path':>22} {'guesses/s':>12}")
+    for size in (250, 10_000):
+        path = use_temp_database(synthetic_players(size))
+        try:
+            with app.read_db() as db:
+                ids = [row['id'] for row in db.execute('SELECT id FROM players')]
+            rng = random.Random(0)
+            guesses = [rng.choice(ids) for _ in range(2_000)]
+            start = time.perf_counter()
+            app.get_daily_puzzle()
+            print(f"{size:>8} {'table build (ms)':>22} {(time.perf_counter() - start) * 1000:>12,.1f}")
+
+            client = app.app.test_client()
+            paths = {
+                'live evaluate_guess': app.evaluate_guess,
+                'table lookup': lambda i: app.lookup_feedback(app.get_daily_puzzle(), i),
+                'POST /api/guess': lambda i: client.post('/api/guess', json={'guess': {'id': i}}),
+            }
+            for name, guess in paths.items():
+                start = time.perf_counter()
+                for guessed_player_id in guesses:
+                    guess(guessed_player_id)
+                rate = len(guesses) / (time.perf_counter() - start)
+                print(f"{size:>8} {name:>22} {rate:>12,.0f}")
+        finally:
+            os.remove(path)
+
+
+def allocated(build):
+    """Bytes still allocated by whatever `build` returns"""
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def bench_store():
+    """Memory per player and id lookup latency for SQLite rows and the roster store"""
+    print(f"{'players':>8} {'path':>22} {'bytes/player':>13} {'p50 us':>10} {'p99 us':>10}")
+    for size in (250, 10_000, 100_000):
+        path = use_temp_database(synthetic_players(size))
+        try:
+            with app.read_db() as db:
+                rows = db.execute('SELECT * FROM players ORDER BY id').fetchall()
+            store = RosterStore(rows)
+            rng = random.Random(0)
+            ids = itertools.cycle([rng.choice(store.ids) for _ in range(1_000)])
+
+            def sqlite_lookup():
+                with closing(app.get_db(readonly=True)) as db:
+                    return dict(db.execute('SELECT * FROM players WHERE id = ?', [next(ids)]).fetchone())
+
+            paths = {
+                'sqlite row -> dict': (lambda: [dict(row) for row in rows], sqlite_lookup),
+                'store record': (lambda: RosterStore(rows), lambda: store.get(next(ids))['age']),
+                'store record -> dict': (None, lambda: store.get(next(ids)).to_dict()),
+            }
+            # Both layouts reuse the row's string objects, so names are not counted
+            for name, (build, lookup) in paths.items():
+                per_player = f"{allocated(build) / size:,.0f}" if build else '-'
+                p50, p99 = timed(lookup, 5_000)
+                print(f"{size:>8} {name:>22} {per_player:>13} {p50:>10.2f} {p99:>10.2f}")
+        finally:
+            os.remove(path)
+
+
+@contextlib.contextmanager
+def fresh_connection():
+    """A new connection per call, as every request used to open"""
+    db = sqlite3.connect(app.DATABASE)
+    db.row_factory = sqlite3.Row
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def bench_db(readers=8, reads=500):
+    """SQL search latency under concurrent /api/update-players refreshes"""
+    print(f"{'connections':>12} {'refreshing':>10} {'p50 us':>10} {'p99 us':>10} {'reads':>7} {'refreshes':>10} {'locked':>7}")
+    path = use_temp_database(app.get_premier_league_players())
+    client = app.app.test_client()
+    try:
+        runs = itertools.product((False, True), (('per request', fresh_connection), ('pooled', app.read_db)))
+        for refreshing, (name, connect) in runs:
+            samples = []
+            errors = []
+            refreshes = 0
+            done = threading.Event()
+
+            def read():
+                rng = random.Random(threading.get_ident())
+                for _ in range(reads):
+                    query = rng.choice(QUERIES)
+                    start = time.perf_counter()
+                    try:
+                        with connect() as db:
+                            app.search_players_like(db, query)
+                    except sqlite3.OperationalError as e:
+                        errors.append(e)
+                    samples.append((time.perf_counter() - start) * 1e6)
+
+            def refresh():
+                nonlocal refreshes
+                while refreshing and not done.is_set():
+                    job_id = client.get('/api/update-players?force=true').get_json()['job_id']
+                    while client.get(f'/api/update-players/{job_id}').get_json()['status'] in ('queued', 'running'):
+                        time.sleep(0.001)
+                    refreshes += 1
+
+            threads = [threading.Thread(target=read) for _ in range(readers)]
+            writer = threading.Thread(target=refresh)
+            # The refresh path logs every save; keep the table readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                writer.start()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                done.set()
+                writer.join()
+
+            samples.sort()
+            locked = sum('database is locked' in str(e) for e in errors)
+            p50, p99 = samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+            print(f"{name:>12} {'yes' if refreshing else 'no':>10} {p50:>10.1f} {p99:>10.1f} {len(samples):>7} {refreshes:>10} {locked:>7}")
+    finally:
+        os.remove(path)
+
+
+def bench_rollover(requests=64):
+    """Request latency across midnight with and without a prewarmed puzzle
+
+    The correctness side of this scenario lives in tests/test_rollover.py.
+    """
+    database = app.DATABASE
+    path = use_temp_database(synthetic_players(10_000))
+    rollover = app.puzzle_rollover
+    real_clock, real_build = rollover.clock, app.build_daily_puzzle
+    builds = []
+    now = 0
+
+    def counting_build(*args):
+        builds.append(args[0])
+        return real_build(*args)
+
+    def tick():
+        # Keep the "Prepared the puzzle" log out of the table
+        with contextlib.redirect_stdout(io.StringIO()):
+            rollover.tick()
+
+    def burst():
+        client = app.app.test_client()
+        barrier = threading.Barrier(requests)
+        dates, samples = [], []
+
+        def request():
+            barrier.wait()
+            start = time.perf_counter()
+            response = client.post('/api/guess/batch', json={'guesses': [1]})
+            samples.append((time.perf_counter() - start) * 1000)
+            dates.append(response.get_json()['date'])
+
+        threads = [threading.Thread(target=request) for _ in range(requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        samples.sort()
+        return set(dates), samples[len(samples) // 2], samples[-1]
+
+    print(f"{'rollover':>10} {'served':>12} {'request builds':>15} {'p50 ms':>8} {'max ms':>8}")
+    try:
+        rollover.clock = lambda: now
+        app.build_daily_puzzle = counting_build
+        for day, prewarm in ((2, True), (3, False)):
+            midnight = datetime(2030, 1, day, tzinfo=app.PUZZLE_TIMEZONE).timestamp()
+            today = rollover.day(midnight).isoformat()
+            now = midnight - 600
+            tick()
+            assert app.get_daily_puzzle().date < today
+            if prewarm:
+                now = midnight - 120
+                tick()
+
+            now = midnight + 0.001
+            del builds[:]
+            dates, p50, worst = burst()
+            tick()
+            assert dates == {today}
+            label = 'prewarmed' if prewarm else 'cold'
+            print(f"{label:>10} {today:>12} {len(builds):>15} {p50:>8.2f} {worst:>8.2f}")
+    finally:
+        rollover.clock, app.build_daily_puzzle = real_clock, real_build
+        rollover.active_day = None
+        app.daily_puzzle = app.next_puzzle = None
+        # Back to the real database; the roster and index reload on next use
+        app.DATABASE, app.fts_enabled = database, None
+        app.roster_store = app.search_index = None
+        os.remove(path)
+
+
+def bench_guesslog(guesses=5_000):
+    """Per-guess cost of logging: none, write-behind buffer, and a synchronous insert"""
+    path = use_temp_database(synthetic_players(10_000))
+    real_log = app.guess_log
+    try:
+        puzzle = app.get_daily_puzzle()
+        ids = [i for i, feedback in enumerate(puzzle.feedback) if feedback is not None]
+        client = app.app.test_client()
+        logs = {
+            'no log': GuessLog(lambda events: None),
+            'write-behind': GuessLog(app.write_guess_events,
+                                     max_batch=app.GUESS_LOG_BATCH, flush_interval=app.GUESS_LOG_INTERVAL),
+            'synchronous insert': GuessLog(app.write_guess_events, max_batch=1),
+        }
+        logs['no log'].append = lambda event: None
+        logs['synchronous insert'].append = lambda event: app.write_guess_events([event])
+
+        rng = random.Random(0)
+
+        def guess():
+            return client.post('/api/guess', json={
+                'guess': {'id': rng.choice(ids)}, 'session': 'bench', 'guess_number': 1})
+
+        app.guess_log = logs['no log']
+        timed(guess, 1_000)
+
+        print(f"{'log':>20} {'p50 us':>10} {'p99 us':>10} {'overhead us':>12}")
+        baseline = None
+        for name, log in logs.items():
+            app.guess_log = log
+            p50, p99 = timed(guess, guesses)
+            baseline = p50 if baseline is None else baseline
+            log.close()
+            print(f"{name:>20} {p50:>10.1f} {p99:>10.1f} {p50 - baseline:>12.1f}")
+
+        # The buffer itself, without the request around it
+        log = GuessLog(lambda events: None)
+        event = (puzzle.date, 'bench', 1, ids[0], 0, 0.0)
+        p50, p99 = timed(lambda: log.append(event), guesses)
+        log.close()
+        print(f"{'GuessLog.append':>20} {p50:>10.2f} {p99:>10.2f}")
+
+        with app.read_db() as db:
+            rows = db.execute('SELECT COUNT(*) FROM guess_events').fetchone()[0]
+        stats = logs['write-behind'].stats()
+        print(f"write-behind: {stats['appended']} appended, {stats['written']} written in "
+              f"{stats['batches']} batches; {rows} rows in guess_events after drain "
+              f"(including the synchronous run)")
+    finally:
+        app.guess_log = real_log
+        os.remove(path)
+
+
+def bench_stats():
+    """/api/stats/today latency as the day's guess log grows"""
+    path = use_temp_database(synthetic_players(10_000))
+    real_stats = app.daily_stats
+    app.daily_stats = app.DailyStats(app.load_day_stats, top_size=app.STATS_TOP_WRONG)
+    try:
+        puzzle = app.get_daily_puzzle()
+        answer = puzzle.player['id']
+        ids = [i for i, feedback in enumerate(puzzle.feedback) if feedback is not None]
+        client = app.app.test_client()
+        rng = random.Random(0)
+        logged = 0
+        print(f"{'events':>8} {'unchanged p50 us':>17} {'changed p50 us':>15} {'GROUP BY p50 us':>16}")
+        for events in (1_000, 10_000, 100_000):
+            batch = []
+            while logged < events:
+                session = f"s{logged}"
+                for number in range(1, rng.randint(1, 8) + 1):
+                    correct = rng.random() < 0.15
+                    batch.append((puzzle.date, session, number, answer if correct else rng.choice(ids),
+                                  int(correct), 0.0))
+                    logged += 1
+                    if correct:
+                        break
+            app.write_guess_events(batch)
+
+            unchanged, _ = timed(lambda: client.get('/api/stats/today'), 2_000)
+            # One new event per request forces the body to be rebuilt every time
+            event = [(puzzle.date, None, None, ids[0], 0, 0.0)]
+            changed, _ = timed(lambda: (app.daily_stats.add_events(event), client.get('/api/stats/today')), 2_000)
+            with app.read_db() as db:
+                group_by, _ = timed(lambda: db.execute('''
+                    SELECT player_id, COUNT(*) AS wrong FROM guess_events
+                    WHERE date = ? AND correct = 0 GROUP BY player_id ORDER BY wrong DESC LIMIT 5
+                ''', [puzzle.date]).fetchall(), 20)
+            print(f"{logged:>8} {unchanged:>17.1f} {changed:>15.1f} {group_by:>16.1f}")
+    finally:
+        app.daily_stats = real_stats
+        os.remove(path)
+
+
+def import_time(pycache, runs=5):
+    """Median self and cumulative import time of the app module, in microseconds"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-X', f'pycache_prefix={pycache}', '-c', 'import app'],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=dict(os.environ, PYTHONDONTWRITEBYTECODE=''))
+        match = re.search(r'import time:\s+(\d+) \|\s+(\d+) \| app$', result.stderr, re.M)
+        samples.append((int(match.group(1)), int(match.group(2))))
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def bench_startup():
+    """Import cost of app.py with and without cached bytecode, and the roster load"""
+    pycache = tempfile.mkdtemp()
+    try:
+        print(f"{'case':>24} {'self us':>10} {'cumulative us':>14}")
+        cold = []
+        for _ in range(5):
+            # An empty cache every time, so app.py is compiled on each run
+            shutil.rmtree(pycache)
+            os.mkdir(pycache)
+            cold.append(import_time(pycache, runs=1))
+        self_us, cumulative_us = sorted(cold)[len(cold) // 2]
+        print(f"{'import app (compile)':>24} {self_us:>10} {cumulative_us:>14}")
+        self_us, cumulative_us = import_time(pycache)
+        print(f"{'import app (cached)':>24} {self_us:>10} {cumulative_us:>14}")
+    finally:
+        shutil.rmtree(pycache)
+
+    p50, _ = timed(app.get_premier_league_players, 200)
+    print(f"{'read data/players.jsonl':>24} {p50:>10.0f}")
+
+
+def bench_refresh():
+    """save_players_to_db for an unchanged roster and one with 1% of players edited"""
+    print(f"{'players':>8} {'case':>12} {'ms':>10} {'inserted':>9} {'updated':>8} {'deleted':>8}")
+    for size in (250, 10_000):
+        players = synthetic_players(size)
+        path = use_temp_database(players)
+        try:
+            edited = [dict(player, age=player['age'] + 1) if i % 100 == 0 else player
+                      for i, player in enumerate(players)]
+            for case, roster in (('unchanged', players), ('1% edited', edited)):
+                start = time.perf_counter()
+                changes = app.save_players_to_db(roster)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"{size:>8} {case:>12} {elapsed:>10.1f} {len(changes.inserted):>9} "
+                      f"{len(changes.updated):>8} {len(changes.deleted):>8}")
+        finally:
+            os.remove(path)
+
+
+@contextlib.contextmanager
+def stub_football_data(squads, latency=0.1, fail_every=0):
+    """Serve `squads` ({team id: [members]}) as football-data.org v4 /teams/{id} on a local port
+
+    Every response waits `latency` seconds; with `fail_every`, every
+    n-th request gets a 429 instead. Responses carry an ETag and a matching
+    If-None-Match gets a 304, so edits to `squads` show up as changes.
+    """
+    from aiohttp import web
+
+    counter = itertools.count(1)
+
+    async def team(request):
+        await asyncio.sleep(latency)
+        if fail_every and next(counter) % fail_every == 0:
+            return web.Response(status=429, headers={'X-RequestCounter-Reset': '0'})
+        team_id = int(request.match_info['id'])
+        body = json.dumps({'id': team_id, 'name': f"Team {team_id}", 'squad': squads[team_id]}).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
+
+    server = web.Application()
+    server.router.add_get('/teams/{id}', team)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(server)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    port = runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+
+def synthetic_squads(teams=20, size=25):
+    """{team name: id} and {id: v4 squad members} built from synthetic_players"""
+    coarse = {'Goalkeeper': 'Goalkeeper', 'Centre-Back': 'Defence', 'Left-Back': 'Defence',
+              'Right-Back': 'Defence', 'Defensive Midfield': 'Midfield', 'Central Midfield': 'Midfield',
+              'Attacking Midfield': 'Midfield', 'Left Wing': 'Offence', 'Right Wing': 'Offence',
+              'Centre-Forward': 'Offence'}
+    players = synthetic_players(teams * size)
+    team_ids = {f"Team {100 + t}": 100 + t for t in range(teams)}
+    squads = {}
+    for t, team_id in enumerate(team_ids.values()):
+        squads[team_id] = [{
+            'id': team_id * 1000 + i,
+            'name': player['name'],
+            'position': coarse[player['position']],
+            'dateOfBirth': f"{2025 - player['age']}-01-01",
+            'nationality': player['nationality'],
+        } for i, player in enumerate(players[t * size:(t + 1) * size])]
+    return team_ids, squads
+
+
+def bench_fetch(teams=20, latency=0.1):
+    """Fetching `teams` squads one by one vs concurrently, against a local stub with fixed latency"""
+    import requests
+    from football_data import fetch_squads, normalize_player
+
+    team_ids, squads = synthetic_squads(teams)
+    today = date.today()
+    print(f"{teams} teams, {latency * 1000:.0f} ms per response")
+    print(f"{'case':>28} {'ms':>8} {'players':>8} {'requests':>9} {'retries':>8}")
+    with stub_football_data(squads, latency) as url:
+        start = time.perf_counter()
+        serial = []
+        with requests.Session() as session:
+            for name, team_id in team_ids.items():
+                response = session.get(f"{url}/teams/{team_id}")
+                response.raise_for_status()
+                serial.extend(normalize_player(member, name, today) for member in response.json()['squad'])
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{'serial (requests)':>28} {elapsed:>8.0f} {len(serial):>8} {teams:>9} {0:>8}")
+
+        for case, limit in (('concurrent, 10 connections', 10), ('concurrent, 20 connections', 20)):
+            start = time.perf_counter()
+            players = fetch_squads(team_ids, cache_dir=None, base_url=url, requests_per_minute=6000,
+                                   max_connections=limit).players
+            elapsed = (time.perf_counter() - start) * 1000
+            assert players == serial
+            print(f"{case:>28} {elapsed:>8.0f} {len(players):>8} {teams:>9} {0:>8}")
+
+    # Every 5th response is a 429, so a fifth of the teams go through a retry
+    from football_data import FootballDataClient
+
+    async def run(url):
+        async with FootballDataClient(base_url=url, requests_per_minute=6000, retry_base_delay=0.05) as client:
+            players, _ = await client.fetch_teams(team_ids, today)
+            return players, client
+
+    with stub_football_data(squads, latency, fail_every=5) as url:
+        start = time.perf_counter()
+        players, client = asyncio.run(run(url))
+        elapsed = (time.perf_counter() - start) * 1000
+        assert players == serial
+        print(f"{'concurrent, 1 in 5 is a 429':>28} {elapsed:>8.0f} {len(players):>8} "
+              f"{client.requests:>9} {client.retries:>8}")
+
+    # The free tier's 10 requests a minute is the real ceiling for live refreshes
+    print(f"free tier floor for {teams} teams: {max(teams - 10, 0) * 6} s")
+
+
+def bench_conditional(teams=20, latency=0.1):
+    """Full football-data refreshes through the response cache: cold, unchanged, and 2 teams edited"""
+    import football_data
+
+    team_ids, squads = synthetic_squads(teams)
+    cache_dir = tempfile.mkdtemp()
+    path = use_temp_database([])
+    fetch_squads = football_data.fetch_squads
+    source = app.PLAYER_SOURCE
+    app.PLAYER_SOURCE = 'football-data'
+    print(f"{teams} teams, {latency * 1000:.0f} ms per response")
+    print(f"{'case':>14} {'ms':>8} {'requests':>9} {'hits':>6} {'KB saved':>9} {'skipped':>8} "
+          f"{'inserted':>9} {'updated':>8} {'unchanged':>10}")
+    try:
+        with stub_football_data(squads, latency) as url:
+            football_data.fetch_squads = functools.partial(
+                fetch_squads, team_ids, cache_dir=cache_dir, base_url=url, requests_per_minute=6000)
+            for case in ('cold', 'unchanged', '2 teams edited'):
+                if case == '2 teams edited':
+                    for team_id in list(squads)[:2]:
+                        squads[team_id] = [dict(member, nationality='Wales') for member in squads[team_id]]
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    changes = app.fetch_players()
+                elapsed = (time.perf_counter() - start) * 1000
+                stats = app.fetch_stats
+                print(f"{case:>14} {elapsed:>8.0f} {stats['requests']:>9} {stats['cache_hits']:>6} "
+                      f"{stats['bytes_saved'] / 1024:>9.0f} {stats['teams_skipped']:>8} "
+                      f"{len(changes.inserted):>9} {len(changes.updated):>8} {changes.unchanged:>10}")
+            with app.read_db() as db:
+                assert db.execute('SELECT COUNT(*) FROM players').fetchone()[0] == teams * 25
+                assert db.execute("SELECT COUNT(*) FROM players WHERE nationality = 'Wales'").fetchone()[0] == 50
+    finally:
+        football_data.fetch_squads = fetch_squads
+        app.PLAYER_SOURCE = source
+        shutil.rmtree(cache_dir)
+        os.remove(path)
+
+
+BENCHMARKS = {
+    'search': bench_search,
+    'phonetic': bench_phonetic,
+    'filters': bench_filters,
+    'guess': bench_guess,
+    'store': bench_store,
+    'db': bench_db,
+    'rollover': bench_rollover,
+    'guesslog': bench_guesslog,
+    'stats': bench_stats,
+    'startup': bench_startup,
+    'refresh': bench_refresh,
+    'fetch': bench_fetch,
+    'conditional': bench_conditional,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
@@ -0,0 +1,179 @@
+"""Running per-day statistics over the guess event log"""
+import json
+import threading
+
+
+class DayStats:
+    """Counters for one puzzle day, updated one guess event at a time
+
+    Starts are counted from the client's guess number (1 means a new
+    game) or, without one, from the first event of a session. Only
+    a session's first correct guess counts as a solve. The most common wrong
+    guesses are kept as a running top list; counts only ever grow, so a
+    player can only enter it by passing the current last place.
+    """
+
+    __slots__ = ('date', 'started', 'solved', 'guesses', 'solve_guesses', 'histogram',
+                 'wrong', 'top_wrong', 'top_size', 'sessions', 'last_event_id', 'version')
+
+    def __init__(self, date, top_size=5):
+        self.date = date
+        self.started = 0
+        self.solved = 0
+        self.guesses = 0
+        self.solve_guesses = 0
+        self.histogram = {}
+        self.wrong = {}
+        self.top_wrong = []
+        self.top_size = top_size
+        self.sessions = {}
+        self.last_event_id = 0
+        self.version = 0
+
+    def add(self, session_id, guess_number, player_id, correct):
+        self.guesses += 1
+        self.version += 1
+
+        state = None
+        is_new = False
+        if session_id is not None:
+            state = self.sessions.get(session_id)
+            if state is None:
+                state = self.sessions[session_id] = [0, False]
+                is_new = True
+            state[0] += 1
+        if guess_number == 1 or (guess_number is None and is_new):
+            self.started += 1
+
+        if not correct:
+            self._add_wrong(player_id)
+            return
+        if state is not None:
+            if state[1]:
+                return
+            state[1] = True
+        self.solved += 1
+        count = guess_number or (state[0] if state is not None else None)
+        if count:
+            self.histogram[count] = self.histogram.get(count, 0) + 1
+            self.solve_guesses += count
+
+    def _add_wrong(self, player_id):
+        count = self.wrong[player_id] = self.wrong.get(player_id, 0) + 1
+        top = self.top_wrong
+        if player_id not in top:
+            if len(top) < self.top_size:
+                top.append(player_id)
+            elif count > self.wrong[top[-1]]:
+                top[-1] = player_id
+            else:
+                return
+        # Bubble the player up past anyone it now outnumbers
+        i = top.index(player_id)
+        while i and self.wrong[top[i - 1]] < count:
+            top[i - 1], top[i] = top[i], top[i - 1]
+            i -= 1
+
+    def summary(self):
+        """Plain-dict view of the counters (top wrong guesses as (player id, count))"""
+        return {
+            'date': self.date,
+            'started': self.started,
+            'solved': self.solved,
+            'solve_rate': round(self.solved / self.started, 4) if self.started else None,
+            'average_guesses': round(self.solve_guesses / self.solved, 2) if self.solved else None,
+            'guesses': self.guesses,
+            'histogram': {str(n): self.histogram[n] for n in sorted(self.histogram)},
+            'common_wrong_guesses': [(player_id, self.wrong[player_id]) for player_id in self.top_wrong]
+        }
+
+    def checkpoint_row(self):
+        return {
+            'date': self.date,
+            'started': self.started,
+            'solved': self.solved,
+            'guesses': self.guesses,
+            'solve_guesses': self.solve_guesses,
+            'histogram': json.dumps(self.histogram),
+            'wrong_guesses': json.dumps(self.wrong),
+            # Per session: guesses so far and whether it has solved, so a
+            # session carrying on after a restart isn't counted afresh
+            'sessions': json.dumps(self.sessions, separators=(',', ':')),
+            'last_event_id': self.last_event_id
+        }
+
+    @classmethod
+    def from_checkpoint(cls, row, top_size=5):
+        stats = cls(row['date'], top_size)
+        stats.started = row['started']
+        stats.solved = row['solved']
+        stats.guesses = row['guesses']
+        stats.solve_guesses = row['solve_guesses']
+        stats.histogram = {int(n): count for n, count in json.loads(row['histogram']).items()}
+        stats.wrong = {int(player_id): count for player_id, count in json.loads(row['wrong_guesses']).items()}
+        stats.top_wrong = sorted(stats.wrong, key=lambda player_id: -stats.wrong[player_id])[:top_size]
+        stats.sessions = json.loads(row['sessions'])
+        stats.last_event_id = row['last_event_id']
+        return stats
+
+
+class DailyStats:
+    """Thread-safe collection of DayStats for the most recent `keep_days` days
+
+    `load(date)` supplies the state for a day not seen yet in this process
+    (from a checkpoint plus any events written after it) and is called
+    before that day's first event is applied. Events applied here are only
+    this process's own; `replace` swaps in a day rebuilt from the shared
+    event log, which also covers other processes' events.
+    """
+
+    def __init__(self, load, top_size=5, keep_days=2):
+        self.load = load
+        self.top_size = top_size
+        self.keep_days = keep_days
+        self.days = {}
+        self.dirty = set()
+        self._lock = threading.Lock()
+
+    def get(self, date):
+        """Stats for a date, loading them on first use"""
+        with self._lock:
+            return self._get(date)
+
+    def summary(self, date):
+        """(version, summary dict) for a date; the version changes with every event"""
+        with self._lock:
+            stats = self._get(date)
+            return stats.version, stats.summary()
+
+    def add_events(self, events):
+        """Apply (date, session_id, guess_number, player_id, correct, ...) events"""
+        with self._lock:
+            for date, session_id, guess_number, player_id, correct, *_ in events:
+                self._get(date).add(session_id, guess_number, player_id, correct)
+                self.dirty.add(date)
+
+    def take_dirty(self):
+        """Dates of every day changed since the last call"""
+        with self._lock:
+            dates = sorted(self.dirty)
+            self.dirty.clear()
+            return dates
+
+    def replace(self, stats):
+        """Swap in freshly rebuilt stats for a day, keeping its version moving forward"""
+        with self._lock:
+            old = self.days.get(stats.date)
+            if old is not None:
+                stats.version = max(stats.version, old.version + 1)
+            self.days[stats.date] = stats
+
+    def _get(self, date):
+        stats = self.days.get(date)
+        if stats is None:
+            stats = self.days[date] = self.load(date) or DayStats(date, self.top_size)
+            # Older days only live on in their checkpoints
+            for old in sorted(self.days)[:-self.keep_days]:
+                if old != date and old not in self.dirty:
+                    del self.days[old]
+        return stats
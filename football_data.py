@@ -0,0 +1,345 @@
+"""Concurrent squad fetcher for the football-data.org v4 API"""
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from datetime import date
+
+import aiohttp
+
+from config import FOOTBALL_DATA_API_KEY, FOOTBALL_DATA_BASE_URL, TEAM_IDS
+
+# The free tier allows 10 requests a minute; paid plans raise it
+REQUESTS_PER_MINUTE = int(os.getenv('FOOTBALL_DATA_REQUESTS_PER_MINUTE', '10'))
+MAX_CONNECTIONS = 10
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 0.5
+REQUEST_TIMEOUT = 30
+CHUNK_SIZE = 16 * 1024
+
+# Responses are kept here so later refreshes can ask whether they've changed
+CACHE_DIR = os.getenv('FOOTBALL_DATA_CACHE_DIR', os.path.join('.cache', 'football-data'))
+
+# The v4 squad lists give broad positions; map them onto the game's specific ones
+POSITIONS = {
+    'Goalkeeper': 'Goalkeeper',
+    'Defence': 'Centre-Back',
+    'Defender': 'Centre-Back',
+    'Midfield': 'Central Midfield',
+    'Midfielder': 'Central Midfield',
+    'Offence': 'Centre-Forward',
+    'Attacker': 'Centre-Forward',
+}
+
+
+class TokenBucket:
+    """Async rate limiter: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# Players of the teams that changed, the names of every team asked for and of
+# those that hadn't changed, the client's counters, and the new (url, etag,
+# last_modified, body) responses to cache once the players are saved
+SquadFetch = namedtuple('SquadFetch', ['players', 'teams', 'skipped_teams', 'stats', 'responses', 'cache'])
+
+CachedResponse = namedtuple('CachedResponse', ['path', 'etag', 'last_modified', 'size', 'offset'])
+
+
+class ResponseCache:
+    """Response bodies on disk, keyed by URL, with the validators they were served with
+
+    Each entry is one file: a JSON header line (URL, ETag, Last-Modified,
+    body size) followed by the raw body. Entries are written to a temporary
+    file and renamed into place, so a reader never sees half of one.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def get(self, url):
+        """The CachedResponse for `url`, or None"""
+        path = self._path(url)
+        try:
+            with open(path, 'rb') as f:
+                header = f.readline()
+                meta = json.loads(header)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return CachedResponse(path, meta.get('etag'), meta.get('last_modified'), meta['size'], len(header))
+
+    def put(self, url, etag, last_modified, body):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(url)
+        header = json.dumps({'url': url, 'etag': etag, 'last_modified': last_modified, 'size': len(body)})
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(header.encode() + b'\n')
+            f.write(body)
+        os.replace(tmp, path)
+
+    def put_all(self, responses):
+        for url, etag, last_modified, body in responses:
+            self.put(url, etag, last_modified, body)
+
+    async def chunks(self, entry):
+        """Stream a cached body in CHUNK_SIZE pieces"""
+        with open(entry.path, 'rb') as f:
+            f.seek(entry.offset)
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest()[:32])
+
+
+class RetryableError(Exception):
+    """A response worth trying again, optionally after a server-given delay"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def age_on(birth_date, today):
+    """Whole years between an ISO birth date and `today`"""
+    born = date.fromisoformat(birth_date[:10])
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def normalize_player(raw, team, today):
+    """Map one squad member onto the players table's schema
+
+    The API has no appearance or market value data, so those stay None.
+    """
+    birth_date = raw.get('dateOfBirth')
+    return {
+        'external_id': raw.get('id'),
+        'name': raw['name'],
+        'position': POSITIONS.get(raw.get('position'), raw.get('position')),
+        'nationality': raw.get('nationality'),
+        'age': age_on(birth_date, today) if birth_date else None,
+        'team': team,
+        'league': 'Premier League',
+        'appearances': None,
+        'starts': None,
+        'market_value': None,
+        'market_value_display': None,
+    }
+
+
+async def iter_squad(chunks):
+    """Yield the members of a team response's "squad" array as the body streams in
+
+    Everything before the array is skipped and each member is decoded as
+    soon as its closing brace has arrived, so a large response is never
+    held as one string.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    in_squad = False
+    async for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        if not in_squad:
+            start = buffer.find('"squad"')
+            bracket = buffer.find('[', start) if start != -1 else -1
+            if bracket == -1:
+                # Keep what may be the start of a key split across chunks
+                buffer = buffer[start:] if start != -1 else buffer[-16:]
+                continue
+            in_squad = True
+            pos = bracket + 1
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                member, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Member not complete yet; wait for more bytes
+                break
+            yield member
+            pos = end
+        buffer = buffer[pos:]
+        pos = 0
+
+
+class FootballDataClient:
+    """Pooled, rate-limited client for the team endpoints
+
+    One aiohttp session (and so one connection pool) is shared by every
+    request. Each request takes a token from the bucket first; 429s, 5xx
+    responses and connection errors are retried with exponential backoff
+    and full jitter, honouring the server's reset header when it sends
+    one. Other 4xx responses fail at once.
+
+    With a `cache`, requests are conditional on the cached ETag and
+    Last-Modified. A 304 either skips the team outright (`fetch_team`
+    returns None) or replays the cached body through the parser. New
+    responses are only collected in `responses`; the caller writes them to
+    the cache once it has stored what was parsed from them, so the cache
+    never runs ahead of the database.
+    """
+
+    def __init__(self, base_url=FOOTBALL_DATA_BASE_URL, api_key=FOOTBALL_DATA_API_KEY,
+                 requests_per_minute=REQUESTS_PER_MINUTE, max_connections=MAX_CONNECTIONS,
+                 max_retries=MAX_RETRIES, retry_base_delay=RETRY_BASE_DELAY, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.limiter = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.cache = cache
+        self.responses = []
+        self.session = None
+        self.requests = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.bytes_saved = 0
+        self.teams_skipped = 0
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+            headers={'X-Auth-Token': self.api_key} if self.api_key else {},
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'cache_hits': self.cache_hits,
+            'bytes_saved': self.bytes_saved,
+            'teams_skipped': self.teams_skipped
+        }
+
+    async def fetch_team(self, team_name, team_id, today=None, skip_unchanged=False):
+        """Normalized players of one team, or None if it's unchanged and `skip_unchanged`"""
+        today = today or date.today()
+        url = f"{self.base_url}/teams/{team_id}"
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire()
+            self.requests += 1
+            try:
+                return await self._get_squad(url, team_name, today, skip_unchanged)
+            except aiohttp.ClientResponseError:
+                # Any other 4xx (a bad key, a team outside the plan, a bad id)
+                # won't go away by asking again
+                raise
+            except (RetryableError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                delay = random.uniform(0, self.retry_base_delay * 2 ** attempt)
+                if getattr(e, 'retry_after', None):
+                    delay = max(delay, e.retry_after)
+                print(f"Retrying {url} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def _get_squad(self, url, team_name, today, skip_unchanged):
+        cached = self.cache.get(url) if self.cache else None
+        headers = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                self.cache_hits += 1
+                self.bytes_saved += cached.size
+                if skip_unchanged:
+                    self.teams_skipped += 1
+                    return None
+                return [normalize_player(member, team_name, today)
+                        async for member in iter_squad(self.cache.chunks(cached))]
+            if response.status == 429 or response.status >= 500:
+                reset = response.headers.get('X-RequestCounter-Reset') or response.headers.get('Retry-After')
+                raise RetryableError(f"HTTP {response.status}",
+                                     float(reset) if reset and reset.isdigit() else None)
+            response.raise_for_status()
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if not self.cache or not (etag or last_modified):
+                return [normalize_player(member, team_name, today)
+                        async for member in iter_squad(response.content.iter_chunked(CHUNK_SIZE))]
+
+            # Keep a copy of the body as it streams past the parser
+            body = bytearray()
+
+            async def chunks():
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    body.extend(chunk)
+                    yield chunk
+
+            stream = chunks()
+            players = [normalize_player(member, team_name, today) async for member in iter_squad(stream)]
+            # The parser stops at the end of the squad; the cache needs the rest too
+            async for _ in stream:
+                pass
+            self.responses.append((url, etag, last_modified, bytes(body)))
+            return players
+
+    async def fetch_teams(self, team_ids=TEAM_IDS, today=None, skip_unchanged=()):
+        """Fetch every team concurrently
+
+        Returns (players in team order, names of skipped teams). Teams named
+        in `skip_unchanged` are skipped when upstream reports them unchanged.
+        """
+        squads = await asyncio.gather(*(
+            self.fetch_team(name, team_id, today, name in skip_unchanged)
+            for name, team_id in team_ids.items()
+        ))
+        players = [player for squad in squads if squad is not None for player in squad]
+        skipped = [name for name, squad in zip(team_ids, squads) if squad is None]
+        return players, skipped
+
+
+def fetch_squads(team_ids=TEAM_IDS, skip_unchanged=(), cache_dir=CACHE_DIR, **client_options):
+    """Fetch and normalize the squads of `team_ids` ({team name: id}) as a SquadFetch
+
+    Teams in `skip_unchanged` that upstream reports as unchanged since the
+    cached response are left out of the players and listed as skipped;
+    pass the teams whose stored rows came from that response. Nothing is
+    written to the cache here: once the players are stored, call
+    `result.cache.put_all(result.responses)`. Set `cache_dir` to None to
+    fetch without the cache.
+    """
+    async def run():
+        cache = ResponseCache(cache_dir) if cache_dir else None
+        async with FootballDataClient(cache=cache, **client_options) as client:
+            players, skipped = await client.fetch_teams(team_ids, skip_unchanged=skip_unchanged)
+            return SquadFetch(players, list(team_ids), skipped, client.stats(), client.responses, cache)
+    return asyncio.run(run())
@@ -0,0 +1,116 @@
+"""Write-behind buffer for guess events"""
+import threading
+import time
+from collections import deque
+
+
+class GuessLog:
+    """Buffers events in memory and hands them to `write_batch` from a background thread
+
+    `append` only touches a deque, so the request path never waits on
+    SQLite. The writer thread flushes once `max_batch` events are pending
+    or `flush_interval` seconds after the oldest one arrived, whichever
+    comes first. If a write fails the batch goes back to the front of the
+    queue; past `max_pending` the oldest events are dropped and counted.
+    """
+
+    def __init__(self, write_batch, max_batch=500, flush_interval=1.0, max_pending=100_000,
+                 clock=time.monotonic):
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.clock = clock
+        self._pending = deque()
+        self._oldest = None
+        self._wake = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self.appended = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def append(self, event):
+        """Queue one event; starts the writer thread on first use"""
+        if self._thread is None:
+            self._start()
+        self._pending.append(event)
+        self.appended += 1
+        if self._oldest is None:
+            self._oldest = self.clock()
+        if len(self._pending) >= self.max_batch:
+            with self._wake:
+                self._wake.notify()
+
+    def flush(self):
+        """Write everything queued so far; returns the number of events written"""
+        written = 0
+        with self._flush_lock:
+            self._oldest = None
+            while self._pending:
+                batch = []
+                while self._pending and len(batch) < self.max_batch:
+                    batch.append(self._pending.popleft())
+                try:
+                    self.write_batch(batch)
+                except Exception as e:
+                    print(f"Error writing {len(batch)} guess events: {e}")
+                    self.errors += 1
+                    self._pending.extendleft(reversed(batch))
+                    self._trim()
+                    # Retry after another interval rather than spinning
+                    self._oldest = self.clock()
+                    break
+                self.batches += 1
+                self.written += len(batch)
+                written += len(batch)
+        return written
+
+    def close(self):
+        """Stop the writer thread and drain whatever is still buffered"""
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'appended': self.appended,
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'errors': self.errors
+        }
+
+    def _trim(self):
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+            self.dropped += 1
+
+    def _start(self):
+        with self._wake:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='guess-log', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while not self._closed and not self._due():
+                    oldest = self._oldest
+                    timeout = self.flush_interval if oldest is None else oldest + self.flush_interval - self.clock()
+                    self._wake.wait(max(timeout, 0.001))
+                if self._closed:
+                    return
+            self.flush()
+
+    def _due(self):
+        oldest = self._oldest
+        return len(self._pending) >= self.max_batch or (
+            oldest is not None and self.clock() - oldest >= self.flush_interval)
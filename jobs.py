@@ -0,0 +1,100 @@
+"""Background jobs that run one at a time"""
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class Job:
+    """One run of a background task, with its status and per-stage timings"""
+
+    def __init__(self, job_id, clock=time.time):
+        self.id = job_id
+        self.clock = clock
+        self.status = 'queued'
+        self.created_at = clock()
+        self.started_at = None
+        self.finished_at = None
+        self.stages = []
+        self.result = None
+        self.error = None
+
+    def stage(self, name):
+        """Mark the start of a named step; the previous step ends here"""
+        now = self.clock()
+        self._end_stage(now)
+        self.stages.append({'name': name, 'started_at': now, 'seconds': None})
+
+    def to_dict(self):
+        now = self.clock()
+        end = self.finished_at or now
+        stages = [dict(stage) for stage in self.stages]
+        if stages and stages[-1]['seconds'] is None:
+            stages[-1]['running_for'] = round(now - stages[-1]['started_at'], 3)
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stages[-1]['name'] if self.stages and self.status == 'running' else None,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'seconds': round(end - self.started_at, 3) if self.started_at else None,
+            'stages': stages,
+            'result': self.result,
+            'error': self.error
+        }
+
+    def _end_stage(self, now):
+        if self.stages and self.stages[-1]['seconds'] is None:
+            self.stages[-1]['seconds'] = round(now - self.stages[-1]['started_at'], 3)
+
+
+class JobRunner:
+    """Runs `fn(job)` on a background thread, never more than one at a time
+
+    Submitting while a job is running returns that job instead of starting
+    another, so concurrent callers share one run. The last `history`
+    finished jobs stay available for status lookups.
+    """
+
+    def __init__(self, history=20, clock=time.time):
+        self.history = history
+        self.clock = clock
+        self.jobs = OrderedDict()
+        self.current = None
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+
+    def submit(self, fn):
+        """Start a job unless one is running; returns (job, whether it was started now)"""
+        with self._lock:
+            if self.current is not None:
+                return self.current, False
+            job = Job(f"{next(self._counter)}-{uuid.uuid4().hex[:8]}", self.clock)
+            self.current = job
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.history:
+                self.jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(job, fn), name=f'job-{job.id}', daemon=True).start()
+        return job, True
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _run(self, job, fn):
+        job.started_at = self.clock()
+        job.status = 'running'
+        try:
+            job.result = fn(job)
+            job.status = 'succeeded'
+        except Exception as e:
+            print(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = self.clock()
+            job._end_stage(job.finished_at)
+            with self._lock:
+                self.current = None
@@ -0,0 +1,82 @@
+"""Day boundaries for the daily puzzle and a thread that works ahead of them"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class DayRollover:
+    """Tracks the puzzle day in a fixed timezone and runs hooks around each change
+
+    A day starts `offset` after local midnight in `tz`. From `prewarm`
+    seconds before the next boundary, `prepare(next_day)` is called on every
+    tick so the new day's state can be built while the old one is still
+    served; once the boundary passes, `activate(day)` is called once.
+    `clock` returns Unix seconds and can be swapped for a fake in tests.
+    """
+
+    def __init__(self, prepare, activate, tz, offset=timedelta(0), prewarm=300,
+                 clock=time.time, max_sleep=60):
+        self.prepare = prepare
+        self.activate = activate
+        self.tz = tz
+        self.offset = offset
+        self.prewarm = prewarm
+        self.clock = clock
+        self.max_sleep = max_sleep
+        self.active_day = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def day(self, timestamp=None):
+        """Puzzle day (a date) in effect at `timestamp`, default now"""
+        if timestamp is None:
+            timestamp = self.clock()
+        return (datetime.fromtimestamp(timestamp, self.tz) - self.offset).date()
+
+    def next_boundary(self, timestamp=None):
+        """Unix time at which the day after the one at `timestamp` begins"""
+        if timestamp is None:
+            timestamp = self.clock()
+        next_day = self.day(timestamp) + timedelta(days=1)
+        start = datetime(next_day.year, next_day.month, next_day.day, tzinfo=self.tz) + self.offset
+        return start.timestamp()
+
+    def tick(self):
+        """Run whichever hooks are due and return the seconds until the next one"""
+        now = self.clock()
+        today = self.day(now)
+        if today != self.active_day:
+            self.activate(today)
+            self.active_day = today
+
+        boundary = self.next_boundary(now)
+        remaining = boundary - now
+        if remaining <= self.prewarm:
+            self.prepare(self.day(boundary))
+            return remaining
+        return remaining - self.prewarm
+
+    def start(self):
+        """Tick on a daemon thread until stop() is called"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='day-rollover', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                wait = self.tick()
+            except Exception as e:
+                print(f"Error preparing the next puzzle day: {e}")
+                wait = self.max_sleep
+            # Wake a hair after the boundary, and re-check often enough in the
+            # prewarm window to pick up a roster refresh
+            self._stop.wait(min(max(wait, 0) + 0.001, self.max_sleep))
@@ -0,0 +1,124 @@
+"""Read-only in-memory copy of the players table"""
+from array import array
+from collections.abc import Mapping
+
+# Stored in the integer columns for a NULL; every real value is non-negative
+MISSING = -1
+
+
+class DictionaryColumn:
+    """Low-cardinality text column stored as small integer codes into a value table"""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values):
+        table = {}
+        codes = [table.setdefault(value, len(table)) for value in values]
+        self.values = tuple(table)
+        self.codes = array('B' if len(table) <= 0xFF else 'H' if len(table) <= 0xFFFF else 'I', codes)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+
+class IntColumn:
+    """Nullable integer column packed into a typed array"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, values, typecode='i'):
+        self.data = array(typecode, (MISSING if value is None else value for value in values))
+
+    def __getitem__(self, row):
+        value = self.data[row]
+        return None if value == MISSING else value
+
+
+class PlayerRecord(Mapping):
+    """Dict-like view of one roster row; reads go straight to the store's columns"""
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key):
+        return self._store.columns[key][self._row]
+
+    def __iter__(self):
+        return iter(self._store.columns)
+
+    def __len__(self):
+        return len(self._store.columns)
+
+    def __repr__(self):
+        return f"PlayerRecord({self.to_dict()!r})"
+
+    def to_dict(self):
+        row = self._row
+        return {name: column[row] for name, column in self._store.columns.items()}
+
+
+class RosterStore:
+    """Columnar snapshot of the roster, built once per refresh and never mutated
+
+    Numbers live in typed arrays and repeated strings (team, nationality,
+    league, position, ...) as codes into a per-column value table, so a
+    player costs a few bytes plus its name instead of a dict per row.
+    Records are views created on access; `get` finds one by player id.
+    """
+
+    # Same columns, in the same order, as the players table
+    COLUMNS = (
+        ('id', 'int'), ('player_key', 'text'), ('name', 'text'), ('position', 'dictionary'),
+        ('nationality', 'dictionary'), ('age', 'int'), ('team', 'dictionary'),
+        ('league', 'dictionary'), ('appearances', 'int'), ('starts', 'int'),
+        ('market_value', 'int64'), ('market_value_display', 'dictionary'),
+        ('last_updated', 'dictionary'), ('search_key', 'text'), ('phonetic_keys', 'text'),
+    )
+
+    def __init__(self, rows):
+        rows = [dict(row) for row in rows]
+        columns = {}
+        for name, kind in self.COLUMNS:
+            values = (row.get(name) for row in rows)
+            if kind == 'int':
+                columns[name] = IntColumn(values)
+            elif kind == 'int64':
+                # Transfer fees can pass the 32-bit range
+                columns[name] = IntColumn(values, 'q')
+            elif kind == 'dictionary':
+                columns[name] = DictionaryColumn(values)
+            else:
+                columns[name] = tuple(values)
+
+        self.columns = columns
+        self.ids = columns['id'].data
+        self.max_id = max(self.ids, default=0)
+        # Ids come from AUTOINCREMENT and are dense, so a flat array beats a dict
+        self.row_by_id = array('i', [MISSING]) * (self.max_id + 1)
+        for row, player_id in enumerate(self.ids):
+            self.row_by_id[player_id] = row
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (PlayerRecord(self, row) for row in range(len(self.ids)))
+
+    def get(self, player_id):
+        """Record for a player id, or None"""
+        if not isinstance(player_id, int) or not 0 <= player_id <= self.max_id:
+            return None
+        row = self.row_by_id[player_id]
+        return None if row == MISSING else PlayerRecord(self, row)
+
+    def find_name(self, text):
+        """First record whose name contains `text`, ignoring case like SQL LIKE"""
+        text = text.casefold()
+        for row, name in enumerate(self.columns['name']):
+            if text in name.casefold():
+                return PlayerRecord(self, row)
+        return None
+
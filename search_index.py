@@ -0,0 +1,543 @@
+"""In-memory search index for the player autocomplete"""
+import bisect
+import re
+import time
+import unicodedata
+
+# Letters that NFKD leaves alone because they are not base letter + accent
+TRANSLITERATIONS = str.maketrans({
+    'ø': 'o', 'Ø': 'O', 'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE',
+    'ß': 'ss', 'đ': 'd', 'Đ': 'D', 'ð': 'd', 'Ð': 'D', 'þ': 'th', 'Þ': 'TH',
+    'ł': 'l', 'Ł': 'L', 'ı': 'i', 'ħ': 'h', 'Ħ': 'H',
+})
+
+
+def normalize_search_key(text):
+    """Fold a name or query into the form used for matching
+
+    Accents and case are folded, special letters transliterated ("Ødegaard"
+    and "Gündoğan" become "odegaard" and "gundogan"), apostrophes and dots
+    dropped, and any other punctuation turned into a single space.
+    """
+    text = unicodedata.normalize('NFKD', text.translate(TRANSLITERATIONS))
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = re.sub(r"['\u2019`.]", '', text)
+    return ' '.join(re.sub(r'[\W_]+', ' ', text).split())
+
+
+VOWELS = frozenset('aeiouy')
+
+
+def phonetic_key(word):
+    """Metaphone-style sound key for a single normalized name word
+
+    Close enough to Double Metaphone's primary key for football names:
+    "shaka" and "xhaka" both give "XK", "kvaratskhelia" and "kvaratskelia"
+    both give "KFRTSKL".
+    """
+    word = ''.join(char for char in word if 'a' <= char <= 'z')
+    if not word:
+        return ''
+
+    if word[:2] in ('kn', 'gn', 'pn', 'wr', 'ps'):
+        word = word[1:]
+    elif word.startswith('wh'):
+        word = 'w' + word[2:]
+    elif word[0] == 'x' and word[1:2] != 'h':
+        word = 's' + word[1:]
+
+    codes = []
+    i = 0
+    while i < len(word):
+        char = word[i]
+        prev = word[i - 1] if i else ''
+        rest = word[i + 1:]
+        code = ''
+        skip = 0
+
+        if char in VOWELS:
+            code = 'A' if i == 0 else ''
+        elif char == 'b':
+            code = '' if prev == 'm' and not rest else 'B'
+        elif char == 'c':
+            if rest[:1] == 'h' or rest[:2] == 'ia':
+                code, skip = 'X', rest[:1] == 'h'
+            elif rest[:1] in ('i', 'e', 'y'):
+                code = 'S'
+            else:
+                code = 'K'
+        elif char == 'd':
+            code = 'J' if rest[:2] in ('ge', 'gi', 'gy') else 'T'
+        elif char == 'g':
+            if rest[:1] == 'h' and rest[1:2] not in VOWELS:
+                code, skip = '', 1
+            elif rest[:1] == 'n':
+                code = ''
+            elif rest[:1] in ('i', 'e', 'y'):
+                code = 'J'
+            else:
+                code = 'K'
+        elif char == 'h':
+            code = 'H' if rest[:1] in VOWELS and (not prev or prev not in 'cgkpst') else ''
+        elif char in 'kq':
+            code = '' if prev == 'c' else 'K'
+        elif char == 'p':
+            code, skip = ('F', 1) if rest[:1] == 'h' else ('P', 0)
+        elif char == 's':
+            if rest[:1] == 'h' or rest[:2] in ('io', 'ia'):
+                code, skip = 'X', rest[:1] == 'h'
+            else:
+                code = 'S'
+        elif char == 't':
+            if rest[:2] in ('io', 'ia'):
+                code = 'X'
+            elif rest[:1] == 'h':
+                code, skip = '0', 1
+            else:
+                code = '' if rest[:2] == 'ch' else 'T'
+        elif char == 'v':
+            code = 'F'
+        elif char in 'wy':
+            code = char.upper() if rest[:1] in VOWELS else ''
+        elif char == 'x':
+            # Albanian and Catalan "xh"/"x" sound like "sh"
+            if rest[:1] == 'h' or i == 0:
+                code, skip = 'X', rest[:1] == 'h'
+            else:
+                code = 'KS'
+        elif char == 'z':
+            code = 'S'
+        else:
+            code = char.upper()
+
+        if code and (not codes or codes[-1] != code):
+            codes.append(code)
+        i += 1 + skip
+
+    return ''.join(codes)
+
+
+def phonetic_keys(search_key):
+    """Distinct phonetic keys for the words of a normalized name"""
+    return sorted({key for key in map(phonetic_key, search_key.split()) if key})
+
+
+def levenshtein(a, b):
+    """Edit distance between two strings"""
+    return levenshtein_from(a)(b)
+
+
+def levenshtein_from(pattern):
+    """Return a function computing the edit distance from `pattern` to a string
+
+    Uses Myers' bit-parallel algorithm, so each comparison costs a handful of
+    integer operations per character of the other string.
+    """
+    m = len(pattern)
+    if not m:
+        return len
+
+    peq = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+
+    def distance(text):
+        pv, mv, score = mask, 0, m
+        for char in text:
+            eq = peq.get(char, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | ~(xh | pv)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            ph = (ph << 1) | 1
+            pv = ((mh << 1) | ~(xv | ph)) & mask
+            mv = ph & xv & mask
+        return score
+
+    return distance
+
+
+class BKTree:
+    """Burkhard-Keller tree for bounded edit-distance lookups"""
+
+    def __init__(self, terms=()):
+        self.root = None
+        for term in terms:
+            self.add(term)
+
+    def add(self, term):
+        if self.root is None:
+            self.root = (term, {})
+            return
+        node = self.root
+        while True:
+            distance = levenshtein(term, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (term, {})
+                return
+            node = child
+
+    def search(self, query, max_distance, deadline=None, max_nodes=None):
+        """Yield (distance, term) pairs within `max_distance` of `query`
+
+        Stops early once `deadline` (a perf_counter value) passes or
+        `max_nodes` distance computations have been spent.
+        """
+        if self.root is None:
+            return
+        distance_to = levenshtein_from(query)
+        stack = [self.root]
+        visited = 0
+        while stack:
+            if max_nodes is not None and visited >= max_nodes:
+                return
+            if deadline is not None and visited % 32 == 0 and time.perf_counter() > deadline:
+                return
+            term, children = stack.pop()
+            visited += 1
+            distance = distance_to(term)
+            if distance <= max_distance:
+                yield distance, term
+            for edge, child in children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+
+
+def iter_bits(bitmap):
+    """Yield the positions of the set bits of an int bitmap in ascending order"""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+class RangeBitmap:
+    """Bitmaps answering "value between lo and hi" for a numeric column
+
+    Keeps one cumulative bitmap per distinct value (every row with a value
+    at or below it), so any range is a single AND NOT of two of them.
+    """
+
+    def __init__(self, values):
+        by_value = {}
+        for i, value in enumerate(values):
+            if value is not None:
+                by_value[value] = by_value.get(value, 0) | (1 << i)
+
+        self.values = sorted(by_value)
+        self.at_most = []
+        running = 0
+        for value in self.values:
+            running |= by_value[value]
+            self.at_most.append(running)
+
+    def between(self, lo=None, hi=None):
+        upper = bisect.bisect_right(self.values, hi) if hi is not None else len(self.values)
+        lower = bisect.bisect_left(self.values, lo) if lo is not None else 0
+        if upper <= lower:
+            return 0
+        bitmap = self.at_most[upper - 1]
+        if lower:
+            bitmap &= ~self.at_most[lower - 1]
+        return bitmap
+
+
+class PlayerSearchIndex:
+    """N-gram index over the roster returning the same ranking as the SQL search.
+
+    Entries are stored pre-sorted by the secondary ordering (known team first,
+    then name), so every posting list is already in result order and a query
+    only has to walk the exact, prefix and substring tiers until it has
+    enough distinct names.
+    """
+
+    NGRAM = 3
+
+    # Shortest query word worth matching by sound, and the fewest codes the
+    # query's longest key needs; two-code keys like "XK" or "SK" are shared
+    # by too many unrelated names to outrank the typo fallback
+    PHONETIC_MIN_LENGTH = 3
+    PHONETIC_MIN_CODES = 3
+
+    # Typo fallback limits: shortest query worth correcting and the hard
+    # per-query budget for walking the BK-tree
+    FUZZY_MIN_LENGTH = 3
+    FUZZY_TIME_BUDGET = 0.005
+    FUZZY_MAX_NODES = 2000
+
+    # Facets that filter on exact (case-insensitive) values
+    FACETS = ('team', 'league', 'nationality', 'position_group')
+
+    def __init__(self, rows, aliases=()):
+        rows = sorted(rows, key=lambda row: (row['team'] in (None, 'Unknown'), row['name']))
+
+        self.entries = [{
+            'id': row['id'],
+            'name': row['name'],
+            'team': row['team'],
+            'league': row['league'],
+            'position': row['position'],
+            'age': row['age'],
+            'nation': row['nation'],
+            'market_value_display': row['market_value_display'],
+            'label': f"{row['name']} ({row['team']})"
+        } for row in rows]
+        self.keys = [row['search_key'] or normalize_search_key(row['name']) for row in rows]
+
+        # key -> entry indices, in result order
+        self.exact = {}
+        # first 1..NGRAM characters -> entry indices
+        self.prefixes = {}
+        # every 1..NGRAM character substring -> entry indices
+        self.grams = {}
+
+        for i, key in enumerate(self.keys):
+            self.exact.setdefault(key, []).append(i)
+            for n in range(1, min(self.NGRAM, len(key)) + 1):
+                self.prefixes.setdefault(key[:n], []).append(i)
+            grams = {key[j:j + n]
+                     for n in range(1, self.NGRAM + 1)
+                     for j in range(len(key) - n + 1)}
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(i)
+
+        # Phonetic key of each name word -> entry indices, in result order
+        self.phonetic = {}
+        self.entry_phonetic = []
+        for i, row in enumerate(rows):
+            keys = row['phonetic_keys'].split() if row['phonetic_keys'] else phonetic_keys(self.keys[i])
+            self.entry_phonetic.append(frozenset(keys))
+            for key in keys:
+                self.phonetic.setdefault(key, []).append(i)
+
+        # Facet value -> bitmap of entry indices, plus range bitmaps for
+        # age and market value; filters are intersections of these
+        self.facets = {facet: {} for facet in self.FACETS}
+        for i, row in enumerate(rows):
+            for facet in self.FACETS:
+                value = row[facet]
+                if value is not None:
+                    bitmaps = self.facets[facet]
+                    key = value.casefold()
+                    bitmaps[key] = bitmaps.get(key, 0) | (1 << i)
+        self.ages = RangeBitmap(row['age'] for row in rows)
+        self.market_values = RangeBitmap(row['market_value'] for row in rows)
+
+        # Normalized alias -> entry indices, swapped out by set_aliases()
+        self.aliases = {}
+        self.set_aliases(aliases)
+
+        # Individual name words for the typo fallback
+        self.fuzzy_terms = {}
+        for i, key in enumerate(self.keys):
+            for term in set(key.split()):
+                self.fuzzy_terms.setdefault(term, []).append(i)
+        self.fuzzy_tree = BKTree(sorted(self.fuzzy_terms))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def compact(self):
+        """Columnar form of the roster for client-side search
+
+        Rows keep the index's result order. Teams, positions, nations and
+        leagues are dictionary-encoded into small lookup lists.
+        """
+        dictionaries = {field: {} for field in ('team', 'position', 'nation', 'league')}
+
+        def encode(field, value):
+            codes = dictionaries[field]
+            return codes.setdefault(value, len(codes))
+
+        columns = {
+            'id': [entry['id'] for entry in self.entries],
+            'name': [entry['name'] for entry in self.entries],
+            'key': self.keys,
+            'age': [entry['age'] for entry in self.entries],
+            'value': [entry['market_value_display'] for entry in self.entries],
+        }
+        for field in dictionaries:
+            columns[field] = [encode(field, entry[field]) for entry in self.entries]
+
+        compact = {field + 's': list(codes) for field, codes in dictionaries.items()}
+        compact.update(columns)
+        compact['aliases'] = self.aliases
+        return compact
+
+    def set_aliases(self, aliases):
+        """Replace the alias map from (alias_key, player_name) pairs
+
+        Aliases naming players that are not on the roster are ignored.
+        Only the alias map is rebuilt, never the name postings.
+        """
+        resolved = {}
+        for alias_key, player_name in aliases:
+            for i in self.exact.get(normalize_search_key(player_name), ()):
+                resolved.setdefault(alias_key, set()).add(i)
+        self.aliases = {alias_key: sorted(indices) for alias_key, indices in resolved.items()}
+
+    def filter_bitmap(self, filters=None, age=(None, None), market_value=(None, None)):
+        """Bitmap of entries passing the given filters, or None when unfiltered
+
+        `filters` maps a facet to a list of accepted values (any of them
+        matches); `age` and `market_value` are inclusive (lo, hi) bounds.
+        """
+        bitmap = None
+        for facet, values in (filters or {}).items():
+            if not values:
+                continue
+            bitmaps = self.facets[facet]
+            matches = 0
+            for value in values:
+                matches |= bitmaps.get(value.casefold(), 0)
+            bitmap = matches if bitmap is None else bitmap & matches
+
+        for ranges, bounds in ((self.ages, age), (self.market_values, market_value)):
+            if bounds != (None, None):
+                matches = ranges.between(*bounds)
+                bitmap = matches if bitmap is None else bitmap & matches
+        return bitmap
+
+    def search(self, query, limit=10, fuzzy=True, bitmap=None):
+        """Return up to `limit` players matching `query`, best match first
+
+        Nicknames from the alias table rank right after exact name matches.
+        After the exact, prefix and substring tiers come players whose name
+        words sound like the query words, and if there are still fewer than
+        `limit` players the remaining slots are filled with names within a
+        small edit distance of the query.
+
+        `bitmap` (from filter_bitmap()) restricts results to those entries.
+        """
+        query = normalize_search_key(query)
+        keys = self.keys
+        results = []
+        seen_names = set()
+        # Shifting the int bitmap copies it, so each test would cost O(roster);
+        # unpack it into bytes once and test bits in constant time
+        mask = bitmap.to_bytes((len(self.entries) + 7) // 8, 'little') if bitmap is not None else None
+
+        def take(indices):
+            # Duplicate names always share a tier and the known-team copy
+            # sorts first, so keeping the first occurrence keeps the best one
+            for i in indices:
+                if mask is not None and not mask[i >> 3] >> (i & 7) & 1:
+                    continue
+                entry = self.entries[i]
+                if entry['name'] in seen_names:
+                    continue
+                seen_names.add(entry['name'])
+                results.append(entry)
+                if len(results) >= limit:
+                    return True
+            return False
+
+        if not query:
+            take(range(len(self.entries)) if bitmap is None else iter_bits(bitmap))
+            return results
+
+        if take(self.exact.get(query, ())):
+            return results
+        if take(self.aliases.get(query, ())):
+            return results
+        if take(i for i in self._prefix_candidates(query) if keys[i] != query):
+            return results
+        if take(i for i in self._substring_candidates(query) if not keys[i].startswith(query)):
+            return results
+        if take(self._phonetic_candidates(query)):
+            return results
+        if fuzzy and len(query) >= self.FUZZY_MIN_LENGTH:
+            take(self._fuzzy_candidates(query))
+        return results
+
+    def _phonetic_candidates(self, query):
+        words = query.split()
+        if not words or any(len(word) < self.PHONETIC_MIN_LENGTH for word in words):
+            return ()
+
+        keys = [phonetic_key(word) for word in words]
+        if max(map(len, keys)) < self.PHONETIC_MIN_CODES:
+            return ()
+
+        postings = []
+        for key in keys:
+            posting = self.phonetic.get(key)
+            if not posting:
+                return ()
+            postings.append(posting)
+
+        if len(postings) == 1:
+            return postings[0]
+
+        # Walk the rarest key's postings in result order and keep players
+        # whose name also has every other key, so the caller can stop early
+        keys = set(keys)
+        entry_keys = self.entry_phonetic
+        return (i for i in min(postings, key=len) if keys <= entry_keys[i])
+
+    def _fuzzy_candidates(self, query):
+        # Every query word has to match a name word within its own typo
+        # allowance; a player's distance is the sum over the query words
+        deadline = time.perf_counter() + self.FUZZY_TIME_BUDGET
+        best = None
+        for word in query.split():
+            if len(word) <= 2:
+                max_distance = 0
+            elif len(word) <= 5:
+                max_distance = 1
+            else:
+                max_distance = 2
+
+            matches = {}
+            for distance, term in self.fuzzy_tree.search(word, max_distance,
+                                                         deadline=deadline,
+                                                         max_nodes=self.FUZZY_MAX_NODES):
+                for i in self.fuzzy_terms[term]:
+                    if distance < matches.get(i, max_distance + 1):
+                        matches[i] = distance
+
+            if best is None:
+                best = matches
+            else:
+                best = {i: best[i] + distance for i, distance in matches.items() if i in best}
+            if not best:
+                return ()
+
+        # Closest first, then the usual known-team and name ordering
+        return sorted(best, key=lambda i: (best[i], i))
+
+    def _prefix_candidates(self, query):
+        if len(query) <= self.NGRAM:
+            return self.prefixes.get(query, ())
+        keys = self.keys
+        return (i for i in self.prefixes.get(query[:self.NGRAM], ()) if keys[i].startswith(query))
+
+    def _substring_candidates(self, query):
+        if len(query) <= self.NGRAM:
+            return self.grams.get(query, ())
+
+        postings = []
+        for j in range(len(query) - self.NGRAM + 1):
+            posting = self.grams.get(query[j:j + self.NGRAM])
+            if not posting:
+                return ()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return ()
+
+        keys = self.keys
+        return (i for i in sorted(candidates) if query in keys[i])
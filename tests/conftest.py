@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import app  # noqa: E402
+from search_index import PlayerSearchIndex, normalize_search_key, phonetic_keys  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def roster():
+    """The seed roster from data/players.jsonl"""
+    return list(app.iter_roster_file(os.path.join(ROOT, app.PLAYERS_FILE)))
+
+
+def index_rows(players):
+    """Rows in the shape rebuild_search_index() hands to PlayerSearchIndex"""
+    rows = []
+    for i, player in enumerate(players, 1):
+        search_key = normalize_search_key(player['name'])
+        rows.append(dict(player, id=i, nation=player['nationality'],
+                         position_group=app.get_position_group(player['position'] or ''),
+                         search_key=search_key, phonetic_keys=' '.join(phonetic_keys(search_key))))
+    return rows
+
+
+@pytest.fixture(scope='session')
+def roster_index(roster):
+    return PlayerSearchIndex(index_rows(roster))
+
+
+@pytest.fixture
+def app_db(tmp_path, monkeypatch, roster):
+    """Point the app at a fresh database loaded with the seed roster
+
+    The app's module-level state is restored afterwards.
+    """
+    monkeypatch.chdir(ROOT)
+    for name in ('fts_enabled', 'roster_store', 'search_index', 'daily_puzzle', 'next_puzzle',
+                 'roster_index_cache', 'roster_generation', 'stats_response'):
+        monkeypatch.setattr(app, name, None if name != 'roster_generation' else app.roster_generation)
+    monkeypatch.setattr(app, 'DATABASE', str(tmp_path / 'players.db'))
+    app.setup_database()
+    app.save_players_to_db(roster)
+    app.rebuild_search_index()
+    return app
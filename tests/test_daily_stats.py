@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from daily_stats import DailyStats, DayStats
+
+DAY = '2030-01-01'
+
+
+def games(count, seed):
+    """Guess events for `count` games: up to 6 guesses each, ending at the first correct one"""
+    rng = random.Random(seed)
+    events = []
+    for game in range(count):
+        session = f"{seed}-{game}"
+        for number in range(1, rng.randint(1, 6) + 1):
+            correct = rng.random() < 0.2
+            events.append((DAY, session, number, 1 if correct else rng.randint(2, 40), int(correct), 0.0))
+            if correct:
+                break
+    return events
+
+
+def expected_summary(events):
+    stats = DayStats(DAY)
+    for _, session, number, player_id, correct, _ in events:
+        stats.add(session, number, player_id, correct)
+    return comparable(stats.summary())
+
+
+def comparable(summary):
+    # Players tied on count may be listed in either order
+    return dict(summary, common_wrong_guesses=[count for _, count in summary['common_wrong_guesses']])
+
+
+def test_day_stats_survive_a_checkpoint_round_trip():
+    events = games(200, seed=1)
+    stats = DayStats(DAY)
+    for _, session, number, player_id, correct, _ in events:
+        stats.add(session, number, player_id, correct)
+    restored = DayStats.from_checkpoint(stats.checkpoint_row())
+    assert restored.summary() == stats.summary()
+    assert restored.sessions == stats.sessions
+
+
+@pytest.fixture
+def workers(app_db, monkeypatch):
+    """Two DailyStats standing in for two worker processes sharing the database"""
+    app = app_db
+    stats = [DailyStats(app.load_day_stats, top_size=app.STATS_TOP_WRONG) for _ in range(2)]
+
+    def as_worker(i):
+        monkeypatch.setattr(app, 'daily_stats', stats[i])
+        return stats[i]
+
+    return as_worker
+
+
+def test_workers_checkpoints_do_not_lose_each_others_events(app_db, workers):
+    app = app_db
+    batches = [games(50, seed) for seed in range(8)]
+    for i, batch in enumerate(batches):
+        worker = i % 2
+        workers(worker)
+        app.write_guess_events(batch)
+        app.checkpoint_daily_stats()
+
+    everything = [event for batch in batches for event in batch]
+    expected = expected_summary(everything)
+
+    # A restarted process rebuilds the day from the checkpoint
+    restarted = DailyStats(app.load_day_stats, top_size=app.STATS_TOP_WRONG)
+    assert comparable(restarted.summary(DAY)[1]) == expected
+    # Each worker's view after its checkpoint includes the other's events
+    assert comparable(workers(1).summary(DAY)[1]) == expected
+    with app.read_db() as db:
+        row = db.execute('SELECT guesses, last_event_id FROM daily_stats WHERE date = ?', [DAY]).fetchone()
+        assert row['guesses'] == len(everything)
+        assert row['last_event_id'] == db.execute('SELECT MAX(id) FROM guess_events').fetchone()[0]
+
+
+def test_events_after_the_last_checkpoint_are_replayed(app_db, workers):
+    app = app_db
+    first, second = games(50, seed=1), games(50, seed=2)
+    workers(0)
+    app.write_guess_events(first)
+    app.checkpoint_daily_stats()
+    workers(1)
+    app.write_guess_events(second)
+
+    restarted = DailyStats(app.load_day_stats, top_size=app.STATS_TOP_WRONG)
+    assert comparable(restarted.summary(DAY)[1]) == expected_summary(first + second)
+
+
+def test_replace_keeps_the_version_moving_forward():
+    stats = DailyStats(lambda date: None)
+    stats.add_events(games(20, seed=3))
+    version, _ = stats.summary(DAY)
+    stats.replace(DayStats(DAY))
+    assert stats.summary(DAY)[0] > version
+
+
+def test_sessions_carry_on_across_checkpoints(app_db, workers):
+    app = app_db
+    # Unnumbered guesses are counted per session, so the session state has to
+    # survive every checkpoint; the last guess repeats an already solved game
+    guesses = [(7, 0), (8, 0), (1, 1), (1, 1)]
+    for i, (player_id, correct) in enumerate(guesses):
+        workers(i % 2)
+        app.write_guess_events([(DAY, 'unnumbered', None, player_id, correct, 0.0)])
+        app.checkpoint_daily_stats()
+
+    for stats in (workers(1), DailyStats(app.load_day_stats, top_size=app.STATS_TOP_WRONG)):
+        summary = stats.summary(DAY)[1]
+        assert (summary['started'], summary['solved'], summary['guesses']) == (1, 1, 4)
+        assert summary['histogram'] == {'3': 1}
+
+
+def test_a_resolved_session_is_not_a_second_solve_after_restart(app_db, workers):
+    app = app_db
+    workers(0)
+    app.write_guess_events([(DAY, 'numbered', 1, 1, 1, 0.0)])
+    app.checkpoint_daily_stats()
+
+    # A restarted process carries on from the checkpoint alone
+    workers(1)
+    app.write_guess_events([(DAY, 'numbered', 2, 1, 1, 0.0)])
+    app.checkpoint_daily_stats()
+
+    restarted = DailyStats(app.load_day_stats, top_size=app.STATS_TOP_WRONG)
+    summary = restarted.summary(DAY)[1]
+    assert (summary['started'], summary['solved'], summary['histogram']) == (1, 1, {'1': 1})
@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.fixture
+def puzzle(app_db):
+    app = app_db
+    store = app.get_roster_store()
+    answer = store.find_name('Erling Haaland')
+    return app.build_daily_puzzle('2026-01-01', app.roster_generation, answer.to_dict())
+
+
+def test_table_matches_live_computation(app_db, puzzle):
+    app = app_db
+    store = app.get_roster_store()
+    assert len(store) > 0
+    for player_id in store.ids:
+        expected = app.json_bytes(app.build_feedback(store.get(player_id), puzzle.player))
+        assert puzzle.feedback[player_id] == expected
+        assert app.lookup_feedback(puzzle, player_id) == (expected, 200)
+        assert app.lookup_feedback(puzzle, str(player_id)) == (expected, 200)
+
+
+def test_answer_is_marked_correct(app_db, puzzle):
+    body, status = app_db.lookup_feedback(puzzle, puzzle.player['id'])
+    assert status == 200
+    assert b'"correct":true' in body.replace(b' ', b'')
+
+
+@pytest.mark.parametrize('player_id', ['missing', -1, None, 'abc', '1.5'])
+def test_unknown_ids_are_not_found(app_db, puzzle, player_id):
+    store = app_db.get_roster_store()
+    if player_id == 'missing':
+        player_id = store.max_id + 1
+    body, status = app_db.lookup_feedback(puzzle, player_id)
+    assert status == 404
+    assert b'Player not found' in body
+
+
+def test_deleted_id_inside_the_table_is_not_found(app_db):
+    app = app_db
+    store = app.get_roster_store()
+    removed = store.find_name('Bukayo Saka')
+    app.save_players_to_db([p for p in app.get_roster_store() if p['id'] != removed['id']])
+    store = app.get_roster_store()
+    assert removed['id'] < store.max_id
+    answer = store.find_name('Erling Haaland')
+    puzzle = app.build_daily_puzzle('2026-01-01', app.roster_generation, answer.to_dict())
+    assert app.lookup_feedback(puzzle, removed['id'])[1] == 404
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web  # noqa: E402
+
+import football_data  # noqa: E402
+
+fetch_squads = football_data.fetch_squads
+
+
+def member(player_id, name, position='Offence', birth='2000-01-01', nationality='England'):
+    return {'id': player_id, 'name': name, 'position': position, 'dateOfBirth': birth,
+            'nationality': nationality}
+
+
+@contextmanager
+def stub_server(handler):
+    """Run `handler(request)` behind /teams/{id} on a local port; yields the base URL"""
+    server = web.Application()
+    server.router.add_get('/teams/{id}', handler)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(server)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    loop.run_until_complete(site.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{runner.addresses[0][1]}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+
+def squad_handler(squads, requests):
+    async def handler(request):
+        team_id = int(request.match_info['id'])
+        requests.append(team_id)
+        return web.json_response({'id': team_id, 'squad': squads[team_id]})
+    return handler
+
+
+def fetch(url, team_ids, **options):
+    options.setdefault('cache_dir', None)
+    return fetch_squads(team_ids, base_url=url, requests_per_minute=6000, retry_base_delay=0.01, **options)
+
+
+def test_squads_are_normalized(tmp_path):
+    squads = {1: [member(10, 'Bukayo Saka', 'Offence'), member(11, 'David Raya', 'Goalkeeper')]}
+    with stub_server(squad_handler(squads, [])) as url:
+        fetched = fetch(url, {'Arsenal': 1})
+    assert [(p['external_id'], p['position'], p['team']) for p in fetched.players] == [
+        (10, 'Centre-Forward', 'Arsenal'), (11, 'Goalkeeper', 'Arsenal')]
+
+
+def test_members_without_a_position_are_skipped(app_db, monkeypatch, roster):
+    app = app_db
+    squads = {1: [
+        member(10, roster[0]['name'], position=None),
+        member(11, 'Unknown Youngster', position=None),
+        member(12, 'Another Youngster', position='Defence'),
+    ]}
+    with stub_server(squad_handler(squads, [])) as url:
+        monkeypatch.setattr(football_data, 'fetch_squads',
+                            lambda skip_unchanged=(): fetch(url, {'Arsenal': 1}))
+        players = app.fetch_api_players().players
+    # The seed roster knows the first player's position; nobody knows the second's
+    assert [(p['name'], p['position']) for p in players] == [
+        (roster[0]['name'], roster[0]['position']), ('Another Youngster', 'Centre-Back')]
+
+
+def test_a_missing_position_does_not_break_feedback(app_db):
+    app = app_db
+    store = app.get_roster_store()
+    answer = store.find_name('Haaland').to_dict()
+    guess = dict(answer, id=-1, position=None)
+    feedback = app.build_feedback(guess, answer)
+    assert feedback['position'] == {'exact': False, 'similar': False}
+    assert app.are_positions_similar(None, None)
+
+
+def test_puzzle_builds_with_a_positionless_row(app_db, roster):
+    app = app_db
+    app.save_players_to_db(roster + [dict(roster[0], name='No Position', position=None)])
+    store = app.get_roster_store()
+    answer = store.find_name('Haaland').to_dict()
+    puzzle = app.build_daily_puzzle('2030-01-01', app.roster_generation, answer)
+    assert app.lookup_feedback(puzzle, store.find_name('No Position')['id'])[1] == 200
+
+
+@pytest.mark.parametrize('status', [401, 403, 404])
+def test_client_errors_are_not_retried(status):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.match_info['id'])
+        return web.Response(status=status)
+
+    with stub_server(handler) as url:
+        with pytest.raises(aiohttp.ClientResponseError) as error:
+            fetch(url, {'Nowhere FC': 9999})
+    assert error.value.status == status
+    assert requests == ['9999']
+
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_rate_limits_and_server_errors_are_retried(status):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.match_info['id'])
+        if len(requests) < 3:
+            return web.Response(status=status, headers={'Retry-After': '0'})
+        return web.json_response({'squad': [member(10, 'Bukayo Saka')]})
+
+    with stub_server(handler) as url:
+        fetched = fetch(url, {'Arsenal': 1})
+    assert len(requests) == 3
+    assert fetched.stats['retries'] == 2
+    assert [p['name'] for p in fetched.players] == ['Bukayo Saka']
+
+
+def etag_handler(squads, requests):
+    """Serve squads with an ETag and answer a matching If-None-Match with a 304"""
+    async def handler(request):
+        team_id = int(request.match_info['id'])
+        body = json.dumps({'id': team_id, 'squad': squads[team_id]}).encode()
+        etag = f'"{hash(body) & 0xffffffff:x}"'
+        conditional = request.headers.get('If-None-Match')
+        requests.append((team_id, conditional))
+        if conditional == etag:
+            return web.Response(status=304, headers={'ETag': etag})
+        return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
+    return handler
+
+
+@pytest.fixture
+def api_source(app_db, monkeypatch, tmp_path):
+    """The app refreshing two teams from a local stub through an on-disk cache"""
+    app = app_db
+    squads = {1: [member(10, 'Bukayo Saka'), member(11, 'David Raya', 'Goalkeeper')],
+              2: [member(20, 'Erling Haaland')]}
+    requests = []
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setattr(app, 'PLAYER_SOURCE', 'football-data')
+    with stub_server(etag_handler(squads, requests)) as url:
+        monkeypatch.setattr(football_data, 'fetch_squads', lambda skip_unchanged=(): fetch(
+            url, {'Arsenal': 1, 'Manchester City': 2}, skip_unchanged=skip_unchanged, cache_dir=str(cache_dir)))
+        yield app, squads, requests, cache_dir
+
+
+def test_unchanged_squads_are_skipped(api_source):
+    app, squads, requests, cache_dir = api_source
+    changes = app.fetch_players()
+    assert len(changes.inserted) == 3
+    assert all(conditional is None for _, conditional in requests)
+
+    del requests[:]
+    changes = app.fetch_players()
+    assert (changes.inserted, changes.updated, changes.deleted, changes.unchanged) == ([], [], [], 3)
+    assert all(conditional is not None for _, conditional in requests)
+    assert app.fetch_stats['teams_skipped'] == 2
+    assert app.fetch_stats['cache_hits'] == 2
+    assert app.fetch_stats['bytes_saved'] > 0
+
+    squads[2] = [member(20, 'Erling Haaland', nationality='Wales')]
+    changes = app.fetch_players()
+    assert len(changes.updated) == 1 and changes.unchanged == 2
+    assert app.fetch_stats['skipped_teams'] == ['Arsenal']
+
+
+def test_nothing_is_cached_until_the_players_are_saved(api_source, monkeypatch):
+    app, squads, requests, cache_dir = api_source
+
+    def crash(*args, **kwargs):
+        raise RuntimeError('process died mid-refresh')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(app, 'save_players_to_db', crash)
+        with pytest.raises(RuntimeError):
+            app.fetch_players()
+    assert not cache_dir.exists() or not any(cache_dir.iterdir())
+
+    # The next refresh asks unconditionally and stores everything
+    del requests[:]
+    changes = app.fetch_players()
+    assert all(conditional is None for _, conditional in requests)
+    assert len(changes.inserted) == 3
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_unchanged_team_missing_from_the_database_is_replayed_from_the_cache(api_source):
+    app, squads, requests, cache_dir = api_source
+    app.fetch_players()
+    with app.write_db() as db:
+        db.execute("DELETE FROM players WHERE team = 'Arsenal'")
+
+    changes = app.fetch_players()
+    assert app.fetch_stats['cache_hits'] == 2
+    assert app.fetch_stats['skipped_teams'] == ['Manchester City']
+    assert len(changes.inserted) == 2
+
+
+def player_count(app):
+    with app.read_db() as db:
+        return db.execute('SELECT COUNT(*) FROM players').fetchone()[0]
+
+
+def test_an_empty_fetch_keeps_the_roster(api_source):
+    app, squads, requests, cache_dir = api_source
+    seeded = player_count(app)
+    squads[1], squads[2] = [], [member(20, 'Erling Haaland', birth=None)]
+
+    with pytest.raises(ValueError):
+        app.fetch_players()
+    assert player_count(app) == seeded
+    assert len(app.get_roster_store()) == seeded
+    assert not cache_dir.exists() or not any(cache_dir.iterdir())
+
+
+@pytest.mark.parametrize('empty', [[], [member(12, 'Unknown Youngster', position=None)]])
+def test_a_team_without_usable_players_keeps_its_rows(api_source, empty):
+    app, squads, requests, cache_dir = api_source
+    app.fetch_players()
+    squads[1] = empty
+    squads[2] = [member(20, 'Erling Haaland', nationality='Wales')]
+
+    changes = app.fetch_players()
+    assert changes.deleted == []
+    assert len(changes.updated) == 1
+    assert app.fetch_stats['empty_teams'] == ['Arsenal']
+    names = sorted(player['name'] for player in app.get_roster_store())
+    assert names == ['Bukayo Saka', 'David Raya', 'Erling Haaland']
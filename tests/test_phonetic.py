@@ -0,0 +1,65 @@
+from search_index import PlayerSearchIndex, phonetic_key
+
+from conftest import index_rows
+
+
+def player(name, team='Arsenal'):
+    return {'name': name, 'team': team, 'league': 'Premier League', 'position': 'Centre-Forward',
+            'nationality': 'England', 'age': 25, 'market_value': 1_000_000,
+            'market_value_display': '€1M'}
+
+
+def test_sound_alike_spellings_share_a_key():
+    assert phonetic_key('shaka') == phonetic_key('xhaka') == 'XK'
+    assert phonetic_key('kvaratskhelia') == phonetic_key('kvaratskelia') == 'KFRTSKL'
+    assert phonetic_key('haaland') == phonetic_key('holand')
+    assert phonetic_key('foden') == phonetic_key('fodun')
+
+
+def test_keys_keep_distinct_sounds_apart():
+    assert phonetic_key('saka') == 'SK'
+    assert phonetic_key('saka') != phonetic_key('shaka')
+    assert phonetic_key('') == ''
+    assert phonetic_key('123') == ''
+
+
+def test_single_word_query_matches_by_sound():
+    index = PlayerSearchIndex(index_rows([player('Khvicha Kvaratskhelia', 'Napoli'), player('Bukayo Saka')]))
+    names = [index.entries[i]['name'] for i in index._phonetic_candidates('kvaratskelia')]
+    assert names == ['Khvicha Kvaratskhelia']
+    assert index._phonetic_candidates('kv') == ()
+
+
+def test_two_code_keys_are_left_to_the_typo_fallback():
+    index = PlayerSearchIndex(index_rows([player('Granit Xhaka', 'Sunderland'), player('Bukayo Saka')]))
+    # "shaka" and "xhaka" share XK, but so do too many unrelated names
+    assert index._phonetic_candidates('shaka') == ()
+    # Both are still one edit away
+    assert sorted(entry['name'] for entry in index.search('shaka')) == ['Bukayo Saka', 'Granit Xhaka']
+
+
+def test_multi_word_query_needs_every_word_to_match():
+    index = PlayerSearchIndex(index_rows([
+        player('Martin Odegaard'), player('Martin Dubravka', 'Burnley'), player('Lisandro Martinez'),
+    ]))
+    names = [index.entries[i]['name'] for i in index._phonetic_candidates('martyn odegard')]
+    assert names == ['Martin Odegaard']
+    # Word order doesn't matter
+    names = [index.entries[i]['name'] for i in index._phonetic_candidates('odegard martyn')]
+    assert names == ['Martin Odegaard']
+    # One word without a match rules the query out
+    assert list(index._phonetic_candidates('martyn zzzz')) == []
+    # Nor does a word too short to match by sound
+    assert index._phonetic_candidates('martyn od') == ()
+
+
+def test_short_keys_do_not_outrank_close_typos(roster_index):
+    # "Cheick" also codes to XK, but only Saka is a plausible reading of "shaka"
+    names = [entry['name'] for entry in roster_index.search('shaka')]
+    assert names[0] == 'Bukayo Saka'
+    assert 'Cheick Doucoure' not in names
+
+
+def test_longer_keys_still_match_by_sound(roster_index):
+    assert roster_index.search('holand')[0]['name'] == 'Erling Haaland'
+    assert roster_index.search('fodun')[0]['name'] == 'Phil Foden'
@@ -0,0 +1,24 @@
+import itertools
+
+import app
+
+# Spellings the roster doesn't use but an upstream source might
+VARIANTS = ['Striker', 'Second Striker', 'Right Winger', 'Left Midfield', 'Right Midfield',
+            'Sweeper', 'Keeper', 'Defence', 'Midfield', 'Offence', 'centre-back', 'LEFT WING']
+
+
+def test_interned_table_matches_live_computation(roster):
+    positions = sorted({player['position'] for player in roster}) + VARIANTS
+    mismatches = [
+        (pos1, pos2) for pos1, pos2 in itertools.product(positions, repeat=2)
+        if app.are_positions_similar(pos1, pos2) != app.compute_positions_similar(pos1, pos2)
+    ]
+    assert mismatches == []
+
+
+def test_ids_stay_valid_as_positions_are_added():
+    first = app.position_id('Right Wing')
+    app.intern_positions(['Brand New Position'])
+    assert app.position_id('Right Wing') == first
+    assert app.positions_similar_by_id(first, app.position_id('Left Wing'))
+    assert not app.positions_similar_by_id(first, app.position_id('Brand New Position'))
@@ -0,0 +1,120 @@
+import threading
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from rollover import DayRollover
+
+REQUESTS = 32
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def burst(app, requests=REQUESTS):
+    """Ask for the puzzle from `requests` threads at once; returns the dates they were served"""
+    barrier = threading.Barrier(requests)
+    dates = []
+
+    def request():
+        client = app.app.test_client()
+        barrier.wait()
+        response = client.post('/api/guess/batch', json={'guesses': [1]})
+        dates.append(response.get_json()['date'])
+
+    threads = [threading.Thread(target=request) for _ in range(requests)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dates
+
+
+@pytest.fixture
+def rollover(app_db, monkeypatch):
+    """The app's rollover driven by a fake clock, with puzzle builds counted"""
+    app = app_db
+    clock = FakeClock()
+    rollover = DayRollover(
+        prepare=app.prepare_next_puzzle,
+        activate=lambda day: app.get_daily_puzzle(),
+        tz=app.PUZZLE_TIMEZONE,
+        offset=app.PUZZLE_ROLLOVER,
+        prewarm=app.PUZZLE_PREWARM_SECONDS,
+        clock=clock
+    )
+    monkeypatch.setattr(app, 'puzzle_rollover', rollover)
+    builds = []
+    build = app.build_daily_puzzle
+
+    def counting_build(*args):
+        builds.append(args[0])
+        return build(*args)
+
+    monkeypatch.setattr(app, 'build_daily_puzzle', counting_build)
+    rollover.builds = builds
+    return rollover, clock
+
+
+def midnight(app, day):
+    return datetime(day.year, day.month, day.day, tzinfo=app.PUZZLE_TIMEZONE).timestamp()
+
+
+def test_prewarmed_rollover_builds_nothing_on_the_request_path(app_db, rollover):
+    rollover, clock = rollover
+    boundary = midnight(app_db, date(2030, 1, 2))
+    clock.now = boundary - 600
+    rollover.tick()
+    assert app_db.get_daily_puzzle().date == '2030-01-01'
+
+    # Inside the prewarm window tomorrow's puzzle is built in the background
+    clock.now = boundary - 120
+    rollover.tick()
+    assert app_db.next_puzzle.date == '2030-01-02'
+    assert app_db.get_daily_puzzle().date == '2030-01-01'
+
+    clock.now = boundary + 0.001
+    del rollover.builds[:]
+    assert set(burst(app_db)) == {'2030-01-02'}
+    assert rollover.builds == []
+
+
+def test_cold_rollover_builds_once_under_concurrent_requests(app_db, rollover):
+    rollover, clock = rollover
+    boundary = midnight(app_db, date(2030, 1, 3))
+    clock.now = boundary - 600
+    rollover.tick()
+
+    clock.now = boundary + 0.001
+    del rollover.builds[:]
+    assert set(burst(app_db)) == {'2030-01-03'}
+    assert rollover.builds == ['2030-01-03']
+
+
+def test_boundary_follows_the_puzzle_timezone():
+    rollover = DayRollover(None, None, tz=ZoneInfo('Europe/London'))
+    boundary = datetime(2030, 7, 1, tzinfo=ZoneInfo('Europe/London')).timestamp()
+    assert rollover.day(boundary - 1) == date(2030, 6, 30)
+    assert rollover.day(boundary) == date(2030, 7, 1)
+    assert rollover.next_boundary(boundary - 1) == boundary
+    # London is on summer time in July, so the day starts at 23:00 UTC
+    assert datetime.fromtimestamp(boundary, timezone.utc).hour == 23
+
+
+def test_tick_waits_for_the_prewarm_window():
+    clock = FakeClock()
+    prepared, activated = [], []
+    rollover = DayRollover(prepared.append, activated.append, tz=timezone.utc,
+                           prewarm=300, clock=clock)
+    clock.now = rollover.next_boundary(1_000_000) - 1000
+    assert rollover.tick() == pytest.approx(700)
+    assert prepared == [] and len(activated) == 1
+    clock.now += 800
+    assert rollover.tick() == pytest.approx(200)
+    assert prepared == [activated[0] + timedelta(days=1)]
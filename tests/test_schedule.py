@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def keyed(app_db, roster):
+    """The seed roster saved with external ids, as the football-data source stores it"""
+    players = [dict(player, external_id=i) for i, player in enumerate(roster, 1)]
+    app_db.save_players_to_db(players)
+    return players
+
+
+def schedule(app):
+    with app.read_db() as db:
+        return {row['date']: (row['player_id'], row['player_name'])
+                for row in db.execute('SELECT date, player_id, player_name FROM daily_puzzles')}
+
+
+def upcoming_dates(app, days=3):
+    today = app.puzzle_rollover.day()
+    return [(today + timedelta(days=n)).isoformat() for n in range(days)]
+
+
+def source_index(app, players, player_id):
+    key = app.get_roster_store().get(player_id)['player_key']
+    return next(i for i, player in enumerate(players) if f"id:{player['external_id']}" == key)
+
+
+def test_renamed_player_keeps_their_dates(app_db, keyed):
+    app = app_db
+    before = schedule(app)
+    renamed = []
+    for day in upcoming_dates(app):
+        player_id, _ = before[day]
+        i = source_index(app, keyed, player_id)
+        keyed[i] = dict(keyed[i], name=f"Renamed {i}")
+        renamed.append((day, player_id, keyed[i]['name']))
+
+    changes = app.save_players_to_db(keyed)
+    assert changes.inserted == [] and changes.deleted == []
+    after = schedule(app)
+    for day, player_id, name in renamed:
+        assert after[day] == (player_id, name)
+
+    # A later refresh that adds someone must not treat them as gone
+    newcomer = dict(keyed[0], external_id=10_000, name='Brand New Signing')
+    changes = app.save_players_to_db(keyed + [newcomer])
+    assert len(changes.inserted) == 1
+    assert schedule(app) == after
+
+
+def test_departed_player_is_replaced_on_upcoming_dates(app_db, keyed):
+    app = app_db
+    before = schedule(app)
+    tomorrow = upcoming_dates(app)[1]
+    player_id, name = before[tomorrow]
+    i = source_index(app, keyed, player_id)
+
+    app.save_players_to_db(keyed[:i] + keyed[i + 1:])
+    after = schedule(app)
+    assert after[tomorrow][0] != player_id
+    assert app.get_roster_store().get(after[tomorrow][0])['name'] == after[tomorrow][1]
+    # Every other date keeps its player
+    assert {day: row for day, row in after.items() if day != tomorrow and row[0] != player_id} == \
+        {day: row for day, row in before.items() if day != tomorrow and row[0] != player_id}
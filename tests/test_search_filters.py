@@ -0,0 +1,36 @@
+import pytest
+
+from search_index import PlayerSearchIndex
+
+from conftest import index_rows
+
+
+@pytest.fixture(scope='module')
+def index(roster):
+    return PlayerSearchIndex(index_rows(roster))
+
+
+def passes(entry, team=None, nationality=None, ages=(None, None)):
+    lo, hi = ages
+    return ((team is None or entry['team'] == team)
+            and (nationality is None or entry['nation'] == nationality)
+            and (lo is None or entry['age'] >= lo) and (hi is None or entry['age'] <= hi))
+
+
+@pytest.mark.parametrize('query', ['', 'a', 'ma', 'son', 'martin'])
+@pytest.mark.parametrize('team, nationality, ages', [
+    ('Arsenal', None, (None, None)),
+    (None, 'England', (20, 25)),
+    ('Manchester City', 'England', (None, 30)),
+    (None, None, (33, None)),
+])
+def test_filtered_search_matches_filtering_the_full_results(index, query, team, nationality, ages):
+    bitmap = index.filter_bitmap({'team': [team] if team else None,
+                                  'nationality': [nationality] if nationality else None}, age=ages)
+    everything = index.search(query, limit=len(index))
+    expected = [entry for entry in everything if passes(entry, team, nationality, ages)][:10]
+    assert index.search(query, bitmap=bitmap) == expected
+
+
+def test_empty_filter_matches_nothing(index):
+    assert index.search('a', bitmap=0) == []
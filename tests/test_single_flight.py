@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from caching import LRUCache, SingleFlight
+
+CALLERS = 16
+
+
+def run_together(target, callers=CALLERS):
+    """Call `target()` from `callers` threads released at the same moment; returns results or errors"""
+    barrier = threading.Barrier(callers)
+    outcomes = [None] * callers
+
+    def worker(i):
+        barrier.wait()
+        try:
+            outcomes[i] = ('result', target())
+        except Exception as e:
+            outcomes[i] = ('error', e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def slow_counted(result=None, error=None, delay=0.2):
+    calls = []
+
+    def fn():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return fn, calls
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    fn, calls = slow_counted(result=b'{"players": []}')
+
+    outcomes = run_together(lambda: flight.do('key', fn))
+
+    assert len(calls) == 1
+    kinds = {kind for kind, _ in outcomes}
+    assert kinds == {'result'}
+    # Every caller gets the very same bytes object
+    body = outcomes[0][1]
+    assert all(value is body for _, value in outcomes)
+    assert flight.stats() == {'in_flight': 0, 'executions': 1, 'shared': CALLERS - 1}
+
+
+def test_an_error_reaches_every_waiting_caller():
+    flight = SingleFlight()
+    error = RuntimeError('database is locked')
+    fn, calls = slow_counted(error=error)
+
+    outcomes = run_together(lambda: flight.do('key', fn))
+
+    assert len(calls) == 1
+    assert all(kind == 'error' and value is error for kind, value in outcomes)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_finished_calls_are_not_cached():
+    flight = SingleFlight()
+    fn, calls = slow_counted(result=b'x', delay=0)
+    flight.do('key', fn)
+    flight.do('key', fn)
+    assert len(calls) == 2
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    fn, calls = slow_counted(result=b'x', delay=0.05)
+    keys = iter(range(CALLERS))
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            key = next(keys)
+        return flight.do(key, fn)
+
+    run_together(call)
+    assert len(calls) == CALLERS
+
+
+@pytest.mark.parametrize('fails', [False, True])
+def test_identical_searches_run_the_query_once(app_db, monkeypatch, fails):
+    app = app_db
+    monkeypatch.setattr(app, 'search_cache', LRUCache())
+    monkeypatch.setattr(app, 'search_flight', SingleFlight())
+    calls = []
+    run_search = app.run_search
+
+    def counted(query, mode=None, filters=()):
+        calls.append(query)
+        time.sleep(0.2)
+        if fails:
+            raise RuntimeError('search failed')
+        return run_search(query, mode, filters)
+
+    monkeypatch.setattr(app, 'run_search', counted)
+
+    def search():
+        response = app.app.test_client().get('/api/players/search?q=saka')
+        return response.status_code, response.data
+
+    outcomes = run_together(search)
+
+    assert calls == ['saka']
+    responses = {value for _, value in outcomes}
+    assert len(responses) == 1
+    status, body = responses.pop()
+    if fails:
+        assert status == 500
+    else:
+        assert status == 200
+        assert b'Bukayo Saka' in body